@@ -0,0 +1 @@
+"""Aiming physics shared by the Dash and Streamlit dashboards."""
@@ -0,0 +1,64 @@
+"""Closed-form point-mass ballistics with quadratic drag.
+
+The bullet decelerates as dv/dt = -k v**2 with k = 0.5 * rho * Cd * A / m,
+which integrates exactly to
+
+    v(t) = v0 / (1 + k v0 t)
+    x(t) = ln(1 + k v0 t) / k
+
+All functions broadcast over NumPy arrays of ``t``/``x`` and ``v0``.
+"""
+import numpy as np
+
+# Constants
+M_BULLET = 0.045  # mass in kg
+CD = 0.295  # drag coefficient
+A = 0.000071  # cross-sectional area in m^2
+RHO = 1.225  # air density in kg/m^3
+
+# Drag constant k in dv/dt = -k v^2 (1/m)
+K_DRAG = 0.5 * RHO * CD * A / M_BULLET
+
+
+def bullet_velocity(t, v0=890, k=K_DRAG):
+    """Speed after flying for ``t`` seconds with muzzle speed ``v0``."""
+    t = np.asarray(t, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    return v0 / (1.0 + k * v0 * t)
+
+
+def bullet_position(t, v0=890, k=K_DRAG):
+    """Distance travelled along the launch direction after ``t`` seconds."""
+    t = np.asarray(t, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    return np.log1p(k * v0 * t) / k
+
+
+def time_to_range(x, v0=890, k=K_DRAG):
+    """Time of flight needed to cover distance ``x`` with muzzle speed ``v0``."""
+    x = np.asarray(x, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    return np.expm1(k * x) / (k * v0)
+
+
+def bullet_position_numerical(t, v0=890):
+    """Reference path: integrate the drag ODE with solve_ivp and quad.
+
+    This is the approach the dashboards used before the closed form, kept
+    to check it against. It is orders of magnitude slower, scalar only,
+    and imports scipy on first use.
+    """
+    from scipy.integrate import solve_ivp, quad
+
+    # Differential equation for velocity reduction
+    def velocity_reduction(t, v):
+        return - (0.5 * RHO * v**2 * CD * A) / M_BULLET
+
+    sol = solve_ivp(velocity_reduction, (0, t), [v0], dense_output=True,
+                    rtol=1e-10, atol=1e-8)
+
+    def bullet_velocity_function(s):
+        return sol.sol(s)[0]
+
+    result, error = quad(bullet_velocity_function, 0, t)
+    return result
@@ -0,0 +1,159 @@
+"""Vectorized aim solver for many engagement scenarios at once.
+
+Each scenario is the dashboard setup: the bomber starts at the origin flying
+along +x at ``v_bomber``, the fighter starts at ``(d, initial_fighter_y)``
+diving along -y at ``v_fighter``, and the gunner fires at ``v_bullet``
+relative to the bomber at angle ``phi``. The bullet flies straight along its
+initial ground-frame velocity ``u`` and slows down under quadratic drag, so
+the intercept conditions are
+
+    F1 = r(t, |u|) * u_x / |u| - d
+    F2 = r(t, |u|) * u_y / |u| - (initial_fighter_y - v_fighter * t)
+
+with ``r`` from :func:`aiming.ballistics.bullet_position`. ``solve_batch``
+runs Newton's method with the exact 2x2 Jacobian on every scenario at once,
+and with ``info=True`` also reports per scenario how many iterations it
+took, the final miss distance and why it stopped.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from aiming.ballistics import K_DRAG, bullet_position, time_to_range
+
+
+# Why a scenario's iteration stopped, indexed by SolveInfo.reason
+REASONS = ('converged', 'iteration limit reached', 'iteration diverged')
+CONVERGED, MAX_ITER, DIVERGED = range(len(REASONS))
+
+
+class SolveInfo(namedtuple('SolveInfo', 'iterations residual reason')):
+    """Per-scenario diagnostics: Newton iterations taken, the last miss
+    distance in metres and a stop code, an index into ``REASONS``."""
+
+    __slots__ = ()
+
+
+def residuals(t, phi, d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+              k=K_DRAG):
+    """Intercept residuals (F1, F2) in metres for the given (t, phi)."""
+    ux = v_bomber + v_bullet * np.cos(phi)
+    uy = v_bullet * np.sin(phi)
+    speed = np.hypot(ux, uy)
+    g = bullet_position(t, speed, k) / speed
+    return g * ux - d, g * uy - (initial_fighter_y - v_fighter * t)
+
+
+def _newton_step(t, phi, d, y, vb, vbomb, vf, k):
+    # Residuals and the analytic Jacobian d(F1, F2)/d(t, phi)
+    cos_phi = np.cos(phi)
+    sin_phi = np.sin(phi)
+    ux = vbomb + vb * cos_phi
+    uy = vb * sin_phi
+    speed = np.hypot(ux, uy)
+    denom = 1.0 + k * speed * t
+    r = np.log1p(k * speed * t) / k
+    g = r / speed
+
+    # dr/dt is the bullet speed, dr/d|u| = t / (1 + k |u| t)
+    dg_dt = 1.0 / denom
+    dspeed_dphi = -vbomb * vb * sin_phi / speed
+    dg_dphi = dspeed_dphi * (t / denom - g) / speed
+
+    f1 = g * ux - d
+    f2 = g * uy - (y - vf * t)
+    j11 = dg_dt * ux
+    j12 = dg_dphi * ux - g * uy
+    j21 = dg_dt * uy + vf
+    j22 = dg_dphi * uy + g * vb * cos_phi
+
+    det = j11 * j22 - j12 * j21
+    dt = (f1 * j22 - f2 * j12) / det
+    dphi = (j11 * f2 - j21 * f1) / det
+    return f1, f2, dt, dphi
+
+
+def solve_batch(d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                t0=None, phi0=None, tol=1e-6, max_iter=50, k=K_DRAG, info=False):
+    """Solve the aiming problem for arrays of scenarios.
+
+    The five scenario parameters broadcast against each other. ``t0`` and
+    ``phi0`` optionally warm-start the iteration; NaN entries fall back to the
+    default guess, the line-of-sight angle and the drag-corrected time to
+    cover that range.
+
+    Returns ``(t_solution, phi_solution, converged)`` arrays with the
+    broadcast shape. A scenario counts as converged when the miss distance
+    drops below ``tol`` metres with a positive time of flight. With
+    ``info=True`` a :class:`SolveInfo` of arrays of the same shape is
+    appended.
+    """
+    d, y, vb, vbomb, vf = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float)
+          for a in (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)))
+    shape = d.shape
+    d, y, vb, vbomb, vf = (a.ravel() for a in (d, y, vb, vbomb, vf))
+
+    phi = np.arctan2(y, d)
+    if phi0 is not None:
+        phi0 = np.broadcast_to(np.asarray(phi0, dtype=float), shape).ravel()
+        phi = np.where(np.isfinite(phi0), phi0, phi)
+    t = time_to_range(np.hypot(d, y), vb + vbomb * np.cos(phi), k)
+    if t0 is not None:
+        t0 = np.broadcast_to(np.asarray(t0, dtype=float), shape).ravel()
+        t = np.where(np.isfinite(t0), t0, t)
+
+    converged = np.zeros(d.size, dtype=bool)
+    iterations = np.zeros(d.size, dtype=np.int32)
+    residual = np.full(d.size, np.nan)
+    reason = np.full(d.size, MAX_ITER, dtype=np.uint8)
+    active = np.arange(d.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        ta, pa = t[active], phi[active]
+        f1, f2, dt, dphi = _newton_step(ta, pa, d[active], y[active],
+                                        vb[active], vbomb[active], vf[active], k)
+
+        miss = np.hypot(f1, f2)
+        residual[active] = miss
+        done = (miss < tol) & (ta > 0)
+        converged[active[done]] = True
+        reason[active[done]] = CONVERGED
+
+        # Damp the update: cap the angle step and never step to t <= 0
+        dphi = np.clip(dphi, -0.5, 0.5)
+        t_new = ta - dt
+        t_new = np.where(t_new > 0, t_new, 0.5 * ta)
+        phi_new = pa - dphi
+
+        finite = np.isfinite(t_new) & np.isfinite(phi_new)
+        reason[active[~done & ~finite]] = DIVERGED
+        keep = ~done & finite
+        active = active[keep]
+        t[active] = t_new[keep]
+        phi[active] = phi_new[keep]
+        iterations[active] += 1
+
+    # Report angles in (-pi, pi]
+    phi = np.arctan2(np.sin(phi), np.cos(phi))
+    result = t.reshape(shape), phi.reshape(shape), converged.reshape(shape)
+    if info:
+        result += (SolveInfo(iterations.reshape(shape), residual.reshape(shape),
+                             reason.reshape(shape)),)
+    return result
+
+
+def solve_aim(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, **kwargs):
+    """Scalar convenience wrapper around :func:`solve_batch`.
+
+    Returns ``(t, phi, converged)`` as Python scalars, plus a scalar
+    :class:`SolveInfo` if ``info=True``.
+    """
+    t, phi, converged, *info = solve_batch(d, initial_fighter_y, v_bullet, v_bomber,
+                                           v_fighter, **kwargs)
+    result = (float(t), float(phi), bool(converged))
+    if info:
+        iterations, residual, reason = info[0]
+        result += (SolveInfo(int(iterations), float(residual), int(reason)),)
+    return result
@@ -0,0 +1,95 @@
+"""LRU-bounded cache of solved scenarios shared by the dashboards.
+
+Keys are the five slider values quantized with :func:`scenario_key`, so a
+slider dragged back to a value it already visited is served from memory.
+Values are whatever the front-end stores for a scenario, typically the
+solution plus its prebuilt figure payload.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# Quantum applied to each of (d, initial_fighter_y, v_bullet, v_bomber,
+# v_fighter) when building keys; finer than any slider step
+KEY_QUANTUM = 1e-3
+
+# Entries kept per process; override with AIM_CACHE_SIZE
+DEFAULT_MAXSIZE = int(os.environ.get('AIM_CACHE_SIZE', 1024))
+
+
+def scenario_key(d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                 quantum=KEY_QUANTUM):
+    """Hashable key for a scenario, rounding each parameter to ``quantum``."""
+    return tuple(int(round(float(v) / quantum))
+                 for v in (d, initial_fighter_y, v_bullet, v_bomber, v_fighter))
+
+
+class SolutionCache:
+    """Thread-safe LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """Like :meth:`get`, but leaves the counters and LRU order alone."""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss.
+
+        ``compute`` runs outside the lock, so concurrent misses on the same
+        key may compute it twice; the last result wins.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,119 @@
+"""Engagement envelopes: the aiming solution over a grid of fighter positions.
+
+For fixed bullet, bomber and fighter velocities, an envelope holds the
+launch angle, the time of flight and whether an intercept exists at every
+node of a ``(d, initial_fighter_y)`` grid covering the slider ranges.
+
+``iter_envelope`` solves the grid progressively. The coarsest level is
+solved from the default guesses, and every finer level (twice the
+resolution per axis) is warm-started from a bilinear interpolation of the
+level before it. Neighbouring cells have nearly the same solution, so most
+fine nodes converge in one or two Newton steps. Front-ends can draw each
+level as it arrives instead of waiting for the full grid.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from aiming.batch import solve_batch
+from aiming.flight import solve_flight
+from aiming.solver import DEFAULT_MODEL
+
+# Extent of the grid, matching the dashboard sliders
+D_RANGE = (100.0, 2000.0)
+Y_RANGE = (100.0, 2000.0)
+
+# Nodes per axis of the finest level
+DEFAULT_SHAPE = (201, 201)
+
+# Nodes per axis below which no coarser level is solved
+COARSEST = 26
+
+
+class Envelope(namedtuple('Envelope', 'd initial_fighter_y t phi feasible')):
+    """Solution grid: axes ``d`` (n,) and ``initial_fighter_y`` (m,), and
+    ``t``, ``phi`` and ``feasible`` arrays of shape (n, m). Infeasible nodes
+    hold NaN in ``t`` and ``phi``."""
+
+    __slots__ = ()
+
+    @property
+    def shape(self):
+        return self.t.shape
+
+    @property
+    def degrees(self):
+        return np.degrees(self.phi)
+
+
+def envelope_shapes(shape=DEFAULT_SHAPE, coarsest=COARSEST):
+    """Grid shapes of the levels, coarse to fine, ending with ``shape``."""
+    shapes = [tuple(shape)]
+    while min(shapes[-1]) // 2 + 1 >= coarsest:
+        shapes.append(tuple(n // 2 + 1 for n in shapes[-1]))
+    return shapes[::-1]
+
+
+def _resample(values, src, dst):
+    # Bilinear interpolation of an (n, m) grid on axes ``src`` onto axes
+    # ``dst``, one axis at a time. NaN nodes spread to every cell touching
+    # them, which the solver then starts from its default guess.
+    for axis, (a, x) in enumerate(zip(src, dst)):
+        i = np.clip(np.searchsorted(a, x, side='right') - 1, 0, len(a) - 2)
+        w = np.clip((x - a[i]) / (a[i + 1] - a[i]), 0.0, 1.0)
+        lo = np.take(values, i, axis=axis)
+        hi = np.take(values, i + 1, axis=axis)
+        w = w[:, None] if axis == 0 else w[None, :]
+        values = lo + (hi - lo) * w
+    return values
+
+
+def solve_level(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, start=None,
+                model=DEFAULT_MODEL, **kwargs):
+    """Solve one grid, warm-started from the :class:`Envelope` ``start``.
+
+    ``model`` picks the physics as in :class:`aiming.solver.AimSolver`;
+    ``kwargs`` go to its solve function (``tol``, ``max_iter``, and ``k``
+    or ``altitude``).
+    """
+    d = np.asarray(d, dtype=float)
+    initial_fighter_y = np.asarray(initial_fighter_y, dtype=float)
+    t0 = phi0 = None
+    if start is not None:
+        src = (start.d, start.initial_fighter_y)
+        dst = (d, initial_fighter_y)
+        t0 = _resample(start.t, src, dst)
+        # Interpolate the angle through its sine and cosine so that it never
+        # averages across the +-pi wrap
+        phi0 = np.arctan2(_resample(np.sin(start.phi), src, dst),
+                          _resample(np.cos(start.phi), src, dst))
+    solve = solve_flight if model == 'gravity' else solve_batch
+    t, phi, converged = solve(d[:, None], initial_fighter_y[None, :],
+                              v_bullet, v_bomber, v_fighter, t0=t0, phi0=phi0, **kwargs)
+    t = np.where(converged, t, np.nan)
+    phi = np.where(converged, phi, np.nan)
+    return Envelope(d, initial_fighter_y, t, phi, converged)
+
+
+def iter_envelope(v_bullet, v_bomber, v_fighter, shape=DEFAULT_SHAPE, d_range=D_RANGE,
+                  y_range=Y_RANGE, coarsest=COARSEST, start=None, **kwargs):
+    """Yield :class:`Envelope` levels from coarse to fine.
+
+    ``start`` is an already solved level (a coarse answer computed earlier,
+    say) that warm-starts the first level yielded here. Levels no finer than
+    ``start`` are skipped. ``kwargs`` go to :func:`solve_level`.
+    """
+    for level in envelope_shapes(shape, coarsest):
+        if start is not None and all(n <= s for n, s in zip(level, start.shape)):
+            continue
+        start = solve_level(np.linspace(*d_range, level[0]), np.linspace(*y_range, level[1]),
+                            v_bullet, v_bomber, v_fighter, start=start, **kwargs)
+        yield start
+
+
+def solve_envelope(v_bullet, v_bomber, v_fighter, shape=DEFAULT_SHAPE, **kwargs):
+    """Finest level of :func:`iter_envelope`."""
+    envelope = None
+    for envelope in iter_envelope(v_bullet, v_bomber, v_fighter, shape, **kwargs):
+        pass
+    return envelope
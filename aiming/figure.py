@@ -0,0 +1,244 @@
+"""Plotly figures of a solved scenario, built as plain dicts.
+
+:class:`FigureBuilder` holds a template figure with the eight traces the
+dashboards draw (bomber path, fighter path, bullet line, aiming direction
+and the four start/impact markers), their styling and the layout. ``build``
+copies that template shallowly and fills in only the coordinates, title and
+axis ranges that depend on the scenario, so nothing static is rebuilt or
+revalidated per request.
+
+``build_envelope`` draws an :class:`aiming.envelope.Envelope` with the same
+layout: a heatmap of the aim angle with time-of-flight contours on top.
+
+The output is the JSON figure format that ``dcc.Graph`` and
+``st.plotly_chart`` accept directly; plotly itself is never imported here.
+Long coordinate arrays (the sampled bullet path, envelope grids) are sent
+as plotly.js typed arrays, base64-encoded float32, instead of JSON number
+lists. :func:`figure_changes` lists the parts of a figure that differ from
+another one, so a front-end can patch only those.
+"""
+import base64
+import math
+
+import numpy as np
+
+from aiming.solver import get_solver
+
+# Trace order of every figure, also relied on by assets/aim_solver.js
+TRACES = (
+    {'mode': 'lines', 'name': 'Bomber Path', 'line': {'color': 'blue', 'width': 3}},
+    {'mode': 'lines', 'name': 'Fighter Path', 'line': {'color': 'green', 'width': 3}},
+    {'mode': 'lines', 'name': 'Bullet Trajectory', 'line': {'color': 'red'}},
+    {'mode': 'lines', 'name': 'Aiming Direction', 'line': {'dash': 'dot', 'color': 'orange'}},
+    {'mode': 'markers+text', 'name': '✈️ Initial Bomber Position', 'text': '✈️',
+     'textfont': {'size': 20}, 'textposition': 'middle center',
+     'marker': {'color': 'blue', 'size': 10, 'symbol': 'circle'}},
+    {'mode': 'markers', 'name': 'Impact Bomber Position',
+     'marker': {'color': 'blue', 'size': 10, 'symbol': 'x'}},
+    {'mode': 'markers+text', 'name': '🛩️ Initial Fighter Position', 'text': '🛩️',
+     'textfont': {'size': 20}, 'textposition': 'middle center',
+     'marker': {'color': 'green', 'size': 10, 'symbol': 'square'}},
+    {'mode': 'markers', 'name': 'Impact Fighter Position',
+     'marker': {'color': 'green', 'size': 10, 'symbol': 'x'}},
+)
+
+
+# Most points of the bullet path sent to the client
+MAX_PATH_POINTS = 64
+
+# Total heading change (rad) below which a path is drawn as a straight line
+PATH_TOLERANCE = 1e-4
+
+# Nodes per axis of the time-of-flight contours; finer grids are subsampled
+MAX_CONTOUR_NODES = 101
+
+# Arrays up to this length stay plain JSON lists
+_TYPED_ARRAY_MIN = 8
+
+
+def typed_array(values, dtype='f4'):
+    """plotly.js typed-array spec of ``values``, with its shape if 2D."""
+    a = np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    spec = {'dtype': dtype, 'bdata': base64.b64encode(a.tobytes()).decode('ascii')}
+    if a.ndim > 1:
+        spec['shape'] = ','.join(str(n) for n in a.shape)
+    return spec
+
+
+def _coordinates(values):
+    values = np.asarray(values, dtype=float)
+    if values.size <= _TYPED_ARRAY_MIN:
+        return values.tolist()
+    return typed_array(values)
+
+
+def simplify_path(x, y, max_points=MAX_PATH_POINTS, tolerance=PATH_TOLERANCE):
+    """Keep at most ``max_points`` samples of a path, denser where it bends.
+
+    A path turning less than ``tolerance`` radians in total is reduced to
+    its endpoints. Otherwise points are spread evenly over a measure that
+    adds the normalized arc length and the normalized turning angle. That
+    gives bends about half of the points, and straight stretches still keep
+    some.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    heading = np.unwrap(np.arctan2(np.diff(y), np.diff(x)))
+    turn = np.abs(np.diff(heading))
+    if x.size <= 2 or turn.sum() < tolerance:
+        return x[[0, -1]], y[[0, -1]]
+    if x.size <= max_points:
+        return x, y
+
+    length = np.hypot(np.diff(x), np.diff(y))
+    weight = length / length.sum() + np.concatenate([[0.0], turn]) / turn.sum()
+    measure = np.concatenate([[0.0], np.cumsum(weight)])
+    keep = np.unique(np.searchsorted(measure, np.linspace(0.0, measure[-1], max_points)))
+    keep = np.union1d(np.clip(keep, 0, x.size - 1), [0, x.size - 1])
+    return x[keep], y[keep]
+
+
+def figure_changes(old, new):
+    """``(path, value)`` pairs that turn figure ``old`` into ``new``.
+
+    Only the trace coordinates, the title and the axis ranges are compared,
+    the parts :class:`FigureBuilder` fills in per scenario. Returns None when
+    the figures have different traces, so nothing short of the whole figure
+    will do.
+    """
+    if len(old['data']) != len(new['data']) or any(
+            a.get('name') != b.get('name') for a, b in zip(old['data'], new['data'])):
+        return None
+    changes = []
+    for i, (a, b) in enumerate(zip(old['data'], new['data'])):
+        for key in ('x', 'y', 'z'):
+            if key in b and a.get(key) != b[key]:
+                changes.append((('data', i, key), b[key]))
+    old_layout, new_layout = old['layout'], new['layout']
+    if old_layout.get('title') != new_layout.get('title'):
+        changes.append((('layout', 'title'), new_layout['title']))
+    for axis in ('xaxis', 'yaxis'):
+        if old_layout[axis].get('range') != new_layout[axis].get('range'):
+            changes.append((('layout', axis, 'range'), new_layout[axis]['range']))
+    return changes
+
+
+class FigureBuilder:
+    """Fill a template figure with one scenario's solution.
+
+    ``layout`` is the static part of the figure layout (legend, axis titles,
+    a plotly theme under ``'template'``...); axis ranges and the title are
+    set per figure. The aiming direction is drawn ``aim_line_scale`` times
+    the horizontal distance long.
+    """
+
+    def __init__(self, layout=None, aim_line_scale=15.0, trace_names=None):
+        traces = [dict(trace, type='scatter') for trace in TRACES]
+        for trace, name in zip(traces, trace_names or ()):
+            trace['name'] = name
+        layout = dict(layout or {})
+        layout.setdefault('xaxis', {})
+        layout.setdefault('yaxis', {})
+        self.template = {'data': traces, 'layout': layout}
+        self.aim_line_scale = aim_line_scale
+
+    def build(self, solution, d, initial_fighter_y, v_bomber, v_fighter, path=None):
+        """Figure dict for ``solution`` (an AimSolution) of the given scenario.
+
+        ``path`` is the sampled bullet path ``(x, y)``, simplified with
+        :func:`simplify_path`; without it the bullet is drawn as a straight
+        line to the impact point.
+        """
+        t, phi = solution.t, solution.phi
+        y = initial_fighter_y
+        bomber_x = v_bomber * t
+        impact_y = y - v_fighter * t
+        aim_length = d * self.aim_line_scale
+        coordinates = (
+            ([0, bomber_x], [0, 0]),
+            ([d, d], [y, impact_y]),
+            tuple(_coordinates(a) for a in simplify_path(*path)) if path is not None
+            else ([0, d], [0, impact_y]),
+            ([0, aim_length * math.cos(phi)], [0, aim_length * math.sin(phi)]),
+            ([0], [0]),
+            ([bomber_x], [0]),
+            ([d], [y]),
+            ([d], [impact_y]),
+        )
+        data = [dict(trace, x=x, y=ys)
+                for trace, (x, ys) in zip(self.template['data'], coordinates)]
+
+        layout = dict(self.template['layout'])
+        # A failed solve still shows where the last iterate pointed, but the
+        # title says so instead of presenting it as an aiming angle
+        layout['title'] = {'text': f'Aiming Angle: {solution.degrees:.2f} degrees'
+                           if solution.converged else solution.status}
+        layout['xaxis'] = dict(layout['xaxis'], range=[-10, d * 1.1])
+        layout['yaxis'] = dict(layout['yaxis'], range=[min(impact_y * 1.2, -100), y * 1.2])
+        return {'data': data, 'layout': layout}
+
+    def build_envelope(self, envelope, d=None, initial_fighter_y=None):
+        """Heatmap figure of an envelope, marking the scenario at ``(d, initial_fighter_y)``.
+
+        Nodes without an intercept are left blank. The contours are drawn from
+        at most ``MAX_CONTOUR_NODES`` nodes per axis.
+        """
+        feasible = envelope.feasible.mean()
+        stride = -(-max(envelope.shape) // MAX_CONTOUR_NODES)
+        data = [
+            {'type': 'heatmap', 'name': 'Aim Angle',
+             'x': typed_array(envelope.d), 'y': typed_array(envelope.initial_fighter_y),
+             'z': typed_array(envelope.degrees.T),
+             'colorscale': 'Viridis', 'colorbar': {'title': {'text': 'Aim angle (deg)'}},
+             'hovertemplate': 'd %{x:.0f} m, y %{y:.0f} m<br>aim %{z:.2f} deg<extra></extra>'},
+            {'type': 'contour', 'name': 'Time of Flight (s)',
+             'x': typed_array(envelope.d[::stride]),
+             'y': typed_array(envelope.initial_fighter_y[::stride]),
+             'z': typed_array(envelope.t[::stride, ::stride].T),
+             'contours': {'coloring': 'lines', 'showlabels': True,
+                          'labelfont': {'color': 'white'}},
+             'line': {'color': 'white', 'width': 1}, 'ncontours': 12,
+             'showscale': False, 'hoverinfo': 'skip'},
+        ]
+        if d is not None and initial_fighter_y is not None:
+            data.append({'type': 'scatter', 'mode': 'markers', 'name': 'Current Scenario',
+                         'x': [d], 'y': [initial_fighter_y],
+                         'marker': {'color': 'red', 'size': 12, 'symbol': 'x'}})
+
+        layout = dict(self.template['layout'])
+        layout['title'] = {'text': f'Engagement Envelope: intercept possible over '
+                                   f'{feasible:.0%} of the grid '
+                                   f'({envelope.shape[0]}x{envelope.shape[1]})'}
+        layout['xaxis'] = dict(layout['xaxis'], range=[envelope.d[0], envelope.d[-1]])
+        layout['yaxis'] = dict(layout['yaxis'],
+                               range=[envelope.initial_fighter_y[0], envelope.initial_fighter_y[-1]])
+        return {'data': data, 'layout': layout}
+
+    @staticmethod
+    def height_style(d, initial_fighter_y, v_fighter, t):
+        """CSS size keeping the plot's aspect close to the scenario's extent."""
+        max_x = d * 1.1 + 10
+        max_y = initial_fighter_y * 1.2 - min(initial_fighter_y - v_fighter * t, -100)
+        return {'width': '100vw', 'height': f"{max(min(max_y / max_x * 100, 100), 50)}vh"}
+
+
+def plot_scenario(builder, d, initial_fighter_y, v_bullet, v_bomber, v_fighter, solver=None,
+                  previous=None):
+    """Solve a scenario and build its figure.
+
+    Returns the dict the dashboards cache: ``t_solution``, ``phi_solution``,
+    the :class:`aiming.solver.AimSolution` as ``solution``, ``figure`` and
+    the Dash ``style``. ``previous`` warm-starts the solve, see
+    :meth:`aiming.solver.AimSolver.solve`. A module-level function so worker
+    processes can run it without importing a front-end.
+    """
+    solver = solver or get_solver()
+    solution = solver.solve(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, previous)
+    path = solver.path(solution, v_bullet, v_bomber)
+    return {
+        't_solution': solution.t,
+        'phi_solution': solution.phi,
+        'solution': solution,
+        'figure': builder.build(solution, d, initial_fighter_y, v_bomber, v_fighter, path),
+        'style': builder.height_style(d, initial_fighter_y, v_fighter, solution.t),
+    }
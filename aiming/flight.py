@@ -0,0 +1,188 @@
+"""Two-dimensional point-mass ballistics with gravity and ISA air density.
+
+The closed form in :mod:`aiming.ballistics` flies the bullet in a straight
+line at sea-level density. Here the bullet follows
+
+    dv/dt = -k(h) |v| v - g e_y,    k(h) = 0.5 * rho(h) * Cd * A / m
+
+where ``rho(h)`` is the International Standard Atmosphere density at the
+bullet's altitude, the bomber's altitude plus its height above the bomber.
+There is no closed form, so :func:`integrate` runs a fixed-step RK4
+integrator over many trajectories at once. Each trajectory gets its own
+step ``t / steps``, so every one of them ends exactly at its requested
+time with the same work per trajectory.
+
+:func:`solve_flight` is the vectorized Newton solve of the intercept
+problem under this model. It starts from the drag-only answer of
+:func:`aiming.batch.solve_batch`, which is already within metres for
+dashboard ranges, so it needs few integrations.
+"""
+import os
+
+import numpy as np
+
+from aiming.ballistics import A, CD, M_BULLET
+from aiming.batch import CONVERGED, DIVERGED, MAX_ITER, SolveInfo, solve_batch
+
+G = 9.80665  # standard gravity in m/s^2
+
+# International Standard Atmosphere: troposphere up to 11 km, then an
+# isothermal layer up to 20 km
+ISA_RHO0 = 1.225  # sea-level density in kg/m^3
+ISA_T0 = 288.15  # sea-level temperature in K
+ISA_LAPSE = 0.0065  # temperature lapse rate in K/m
+ISA_TROPOPAUSE = 11000.0  # m
+ISA_R = 287.05287  # specific gas constant of dry air in J/(kg K)
+_ISA_EXPONENT = G / (ISA_R * ISA_LAPSE) - 1.0
+_ISA_T11 = ISA_T0 - ISA_LAPSE * ISA_TROPOPAUSE
+_ISA_RHO11 = ISA_RHO0 * (_ISA_T11 / ISA_T0) ** _ISA_EXPONENT
+
+# Bomber altitude above sea level in metres; override with AIM_ALTITUDE
+DEFAULT_ALTITUDE = float(os.environ.get('AIM_ALTITUDE', 0.0))
+
+# RK4 steps per trajectory; 32 keeps the intercept point within a millimetre
+# of a 256-step solve over the dashboard ranges
+DEFAULT_STEPS = 32
+
+# Angle offset for the finite-difference column of the Jacobian
+_PHI_EPS = 1e-6
+
+
+def air_density(h):
+    """ISA air density (kg/m^3) at altitude ``h`` metres, up to 20 km."""
+    h = np.asarray(h, dtype=float)
+    troposphere = ISA_RHO0 * np.maximum(1.0 - ISA_LAPSE * h / ISA_T0, 0.0) ** _ISA_EXPONENT
+    # Called once per RK4 stage, so skip the stratosphere when nothing is in it
+    if not (h > ISA_TROPOPAUSE).any():
+        return troposphere
+    stratosphere = _ISA_RHO11 * np.exp(-G * (h - ISA_TROPOPAUSE) / (ISA_R * _ISA_T11))
+    return np.where(h <= ISA_TROPOPAUSE, troposphere, stratosphere)
+
+
+def drag_constant(h):
+    """Drag constant k (1/m) of the bullet at altitude ``h`` metres."""
+    return 0.5 * air_density(h) * CD * A / M_BULLET
+
+
+def _acceleration(y, vx, vy, altitude, g):
+    drag = drag_constant(altitude + y) * np.hypot(vx, vy)
+    return -drag * vx, -drag * vy - g
+
+
+def integrate(t, vx0, vy0, altitude=DEFAULT_ALTITUDE, steps=DEFAULT_STEPS, g=G, path=False):
+    """Fly bullets launched from the origin with velocity ``(vx0, vy0)``.
+
+    Arguments broadcast against each other. Returns ``(x, y, vx, vy)`` at
+    time ``t``; with ``path=True`` each array gains a leading axis of
+    ``steps + 1`` samples, evenly spaced in time from launch to ``t``.
+    """
+    t, vx, vy = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (t, vx0, vy0)))
+    h = t / steps
+    x = np.zeros_like(vx)
+    y = np.zeros_like(vx)
+    vx = vx.copy()
+    vy = vy.copy()
+    samples = [(x, y, vx, vy)] if path else None
+
+    for _ in range(steps):
+        ax1, ay1 = _acceleration(y, vx, vy, altitude, g)
+        vx2, vy2 = vx + 0.5 * h * ax1, vy + 0.5 * h * ay1
+        ax2, ay2 = _acceleration(y + 0.5 * h * vy, vx2, vy2, altitude, g)
+        vx3, vy3 = vx + 0.5 * h * ax2, vy + 0.5 * h * ay2
+        ax3, ay3 = _acceleration(y + 0.5 * h * vy2, vx3, vy3, altitude, g)
+        vx4, vy4 = vx + h * ax3, vy + h * ay3
+        ax4, ay4 = _acceleration(y + h * vy3, vx4, vy4, altitude, g)
+
+        x = x + h / 6.0 * (vx + 2.0 * vx2 + 2.0 * vx3 + vx4)
+        y = y + h / 6.0 * (vy + 2.0 * vy2 + 2.0 * vy3 + vy4)
+        vx = vx + h / 6.0 * (ax1 + 2.0 * ax2 + 2.0 * ax3 + ax4)
+        vy = vy + h / 6.0 * (ay1 + 2.0 * ay2 + 2.0 * ay3 + ay4)
+        if path:
+            samples.append((x, y, vx, vy))
+
+    if path:
+        return tuple(np.stack(column) for column in zip(*samples))
+    return x, y, vx, vy
+
+
+def solve_flight(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, t0=None, phi0=None,
+                 tol=1e-6, max_iter=20, altitude=DEFAULT_ALTITUDE, steps=DEFAULT_STEPS, g=G,
+                 info=False):
+    """Solve the aiming problem under gravity and ISA density.
+
+    Same arguments and return value as :func:`aiming.batch.solve_batch`,
+    including ``info``.
+    Scenarios without a (finite) warm start begin from the drag-only
+    solution at the bomber's altitude. Each Newton iteration integrates
+    every active scenario twice in one batch: once at the current angle and
+    once at a slightly larger one for the angle column of the Jacobian. The
+    time column is the bullet's velocity at impact plus the fighter's
+    descent rate.
+    """
+    d, y, vb, vbomb, vf = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float)
+          for a in (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)))
+    shape = d.shape
+    d, y, vb, vbomb, vf = (a.ravel() for a in (d, y, vb, vbomb, vf))
+
+    t = np.full(d.size, np.nan) if t0 is None else np.broadcast_to(t0, shape).astype(float).ravel()
+    phi = np.full(d.size, np.nan) if phi0 is None else np.broadcast_to(phi0, shape).astype(float).ravel()
+    cold = ~(np.isfinite(t) & np.isfinite(phi))
+    if cold.any():
+        t[cold], phi[cold], _ = solve_batch(d[cold], y[cold], vb[cold], vbomb[cold], vf[cold],
+                                            k=float(drag_constant(altitude)))
+
+    converged = np.zeros(d.size, dtype=bool)
+    iterations = np.zeros(d.size, dtype=np.int32)
+    residual = np.full(d.size, np.nan)
+    reason = np.full(d.size, MAX_ITER, dtype=np.uint8)
+    active = np.arange(d.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        ta, pa = t[active], phi[active]
+        both = np.concatenate([pa, pa + _PHI_EPS])
+        tt = np.concatenate([ta, ta])
+        vba = np.concatenate([vb[active], vb[active]])
+        ux = np.concatenate([vbomb[active], vbomb[active]]) + vba * np.cos(both)
+        # A wild iterate can overflow the integration; it is dropped below as
+        # non-finite
+        with np.errstate(over='ignore', invalid='ignore'):
+            x, h, vx, vy = integrate(tt, ux, vba * np.sin(both), altitude, steps, g)
+        n = active.size
+
+        f1 = x[:n] - d[active]
+        f2 = h[:n] - (y[active] - vf[active] * ta)
+        miss = np.hypot(f1, f2)
+        residual[active] = miss
+        done = (miss < tol) & (ta > 0)
+        converged[active[done]] = True
+        reason[active[done]] = CONVERGED
+
+        j11 = vx[:n]
+        j21 = vy[:n] + vf[active]
+        j12 = (x[n:] - x[:n]) / _PHI_EPS
+        j22 = (h[n:] - h[:n]) / _PHI_EPS
+        det = j11 * j22 - j12 * j21
+        dt = (f1 * j22 - f2 * j12) / det
+        dphi = np.clip((j11 * f2 - j21 * f1) / det, -0.5, 0.5)
+
+        # Damped update, as in solve_batch
+        t_new = ta - dt
+        t_new = np.where(t_new > 0, t_new, 0.5 * ta)
+        phi_new = pa - dphi
+
+        finite = np.isfinite(t_new) & np.isfinite(phi_new)
+        reason[active[~done & ~finite]] = DIVERGED
+        keep = ~done & finite
+        active = active[keep]
+        t[active] = t_new[keep]
+        phi[active] = phi_new[keep]
+        iterations[active] += 1
+
+    phi = np.arctan2(np.sin(phi), np.cos(phi))
+    result = t.reshape(shape), phi.reshape(shape), converged.reshape(shape)
+    if info:
+        result += (SolveInfo(iterations.reshape(shape), residual.reshape(shape),
+                             reason.reshape(shape)),)
+    return result
@@ -0,0 +1,188 @@
+"""Monte Carlo hit probability of an aimed shot.
+
+The aim solution assumes exact muzzle velocity, launch angle and fighter
+speed. Here every shot draws those three from normal distributions around
+their nominal values (:class:`Dispersion` holds the standard deviations).
+The shot then flies under the solver's physics model to where it crosses
+the fighter's track, ``x = d``: the closed-form drag path of
+:mod:`aiming.ballistics`, or under gravity the RK4 integration of
+:mod:`aiming.flight` to the nominal intercept time, extended along the
+shot's velocity to ``x = d``. Its miss distance is the vertical gap to the
+fighter at that moment, and it counts as a hit within ``radius`` metres. A
+whole chunk of shots is one vectorized pass with no per-shot Python.
+
+:func:`iter_hit_probability` spreads chunks over an executor (any
+``submit``), reports an estimate after every finished chunk and stops
+once the Wilson confidence interval of the hit rate is narrow enough,
+rather than after a fixed number of shots.
+"""
+import math
+import statistics
+from collections import namedtuple
+
+import numpy as np
+
+from aiming.ballistics import K_DRAG, time_to_range
+from aiming.flight import DEFAULT_ALTITUDE, integrate
+from aiming.solver import get_solver
+
+# Half-size of the fighter as seen by the bullet, in metres
+HIT_RADIUS = 3.0
+
+# Shots per chunk; one chunk is a single vectorized pass
+CHUNK_SIZE = 50000
+
+# Default half-width of the confidence interval to stop at
+HIT_TOLERANCE = 0.0025
+
+
+class Dispersion(namedtuple('Dispersion', 'muzzle_velocity angle fighter_speed')):
+    """Standard deviations of muzzle velocity (m/s), launch angle (rad) and
+    fighter speed (m/s)."""
+
+    __slots__ = ()
+
+
+DEFAULT_DISPERSION = Dispersion(muzzle_velocity=8.0, angle=2e-3, fighter_speed=10.0)
+
+
+class HitEstimate(namedtuple('HitEstimate', 'p low high hits samples converged')):
+    """Hit rate ``p`` with its confidence interval ``[low, high]`` after
+    ``samples`` shots, and whether the interval reached the requested
+    width."""
+
+    __slots__ = ()
+
+    @property
+    def half_width(self):
+        return 0.5 * (self.high - self.low)
+
+    def progress(self, tol=HIT_TOLERANCE):
+        """Rough fraction of the shots needed to narrow the interval to ``tol``."""
+        if self.converged or self.half_width <= tol:
+            return 1.0
+        return (tol / self.half_width) ** 2
+
+
+def wilson_interval(hits, samples, confidence=0.95):
+    """Wilson score interval ``(low, high)`` of a binomial proportion."""
+    z = statistics.NormalDist().inv_cdf(0.5 + 0.5 * confidence)
+    p = hits / samples
+    scale = 1.0 + z * z / samples
+    center = (p + z * z / (2 * samples)) / scale
+    half = z / scale * math.sqrt(p * (1.0 - p) / samples + z * z / (4 * samples * samples))
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def miss_distances(rng, n, d, initial_fighter_y, v_bullet, v_bomber, v_fighter, t, phi,
+                   dispersion=DEFAULT_DISPERSION, k=K_DRAG, model='drag',
+                   altitude=DEFAULT_ALTITUDE):
+    """Miss distances (m) of ``n`` perturbed shots aimed at ``(t, phi)``.
+
+    ``model`` is ``'drag'`` (with drag constant ``k``) or ``'gravity'``
+    (at bomber ``altitude``), as in :class:`aiming.solver.AimSolver`.
+    Shots that never reach the fighter's track miss by ``inf``.
+    """
+    vb = v_bullet + dispersion.muzzle_velocity * rng.standard_normal(n)
+    angle = phi + dispersion.angle * rng.standard_normal(n)
+    vf = v_fighter + dispersion.fighter_speed * rng.standard_normal(n)
+
+    ux = v_bomber + vb * np.cos(angle)
+    uy = vb * np.sin(angle)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if model == 'gravity':
+            # Fly to the nominal intercept time, then along the velocity to
+            # x = d; shots stray by milliseconds there, so the bend over that
+            # last stretch is negligible
+            x, h, vx, vy = integrate(t, ux, uy, altitude)
+            dt = np.where(vx > 0, (d - x) / vx, np.inf)
+            t_cross = t + dt
+            miss = np.abs(h + vy * dt - (initial_fighter_y - vf * t_cross))
+        else:
+            speed = np.hypot(ux, uy)
+            # Distance along the flight line to x = d, and the time to fly it
+            s = np.where(ux > 0, d * speed / ux, np.inf)
+            t_cross = time_to_range(s, speed, k)
+            miss = np.abs(s * uy / speed - (initial_fighter_y - vf * t_cross))
+    return np.where(np.isfinite(miss), miss, np.inf)
+
+
+def count_hits(seed, n, scenario, aim, dispersion=DEFAULT_DISPERSION, radius=HIT_RADIUS,
+               k=K_DRAG, model='drag', altitude=DEFAULT_ALTITUDE):
+    """Hits among ``n`` shots; a module-level function for worker processes.
+
+    ``seed`` is anything :func:`numpy.random.default_rng` accepts,
+    ``scenario`` the five scenario parameters and ``aim`` the ``(t, phi)``
+    aimed at. The physics arguments are those of :func:`miss_distances`.
+    """
+    rng = np.random.default_rng(seed)
+    misses = miss_distances(rng, n, *scenario, *aim, dispersion=dispersion, k=k, model=model,
+                            altitude=altitude)
+    return int(np.count_nonzero(misses <= radius))
+
+
+def iter_hit_probability(d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                         dispersion=DEFAULT_DISPERSION, radius=HIT_RADIUS, tol=HIT_TOLERANCE,
+                         confidence=0.95, min_samples=100000, max_samples=2000000,
+                         chunk_size=CHUNK_SIZE, seed=None, submit=None, parallel=4,
+                         solver=None, aim=None):
+    """Yield a :class:`HitEstimate` after every finished chunk of shots.
+
+    The shots are aimed at ``aim``, an :class:`aiming.solver.AimSolution`
+    of the scenario, and fly under the physics of ``solver`` (by default
+    the process-wide :func:`aiming.solver.get_solver`), which also solves
+    for the aim when none is given. Without a converged aim nothing is
+    yielded: there is no firing solution to estimate. Chunks
+    go to ``submit(fn, *args)`` (an executor's or a
+    :class:`aiming.pool.LatestRequestPool`'s), keeping up to ``parallel``
+    of them in flight, or run inline without one. Sampling stops once at
+    least ``min_samples`` shots were fired and the confidence interval's
+    half-width is at most ``tol``, or after ``max_samples`` shots; queued
+    chunks are then cancelled. Each chunk has its own seed derived from
+    ``seed``, so a seeded estimate is reproducible for a given
+    ``chunk_size``.
+    """
+    scenario = (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+    solver = get_solver() if solver is None else solver
+    aim = solver.solve(*scenario) if aim is None else aim
+    if not aim.converged:
+        return
+    physics = (solver.k, solver.model, solver.altitude)
+    seeds = np.random.SeedSequence(seed)
+    hits = samples = 0
+    pending = []
+    try:
+        while True:
+            # Keep the pool busy, but never schedule past max_samples
+            while len(pending) < (parallel if submit else 1):
+                scheduled = samples + sum(n for n, _ in pending)
+                if scheduled >= max_samples:
+                    break
+                n = min(chunk_size, max_samples - scheduled)
+                args = (seeds.spawn(1)[0], n, scenario, (aim.t, aim.phi), dispersion, radius,
+                        *physics)
+                pending.append((n, submit(count_hits, *args) if submit else count_hits(*args)))
+            if not pending:
+                return
+
+            n, result = pending.pop(0)
+            hits += result.result() if submit else result
+            samples += n
+            low, high = wilson_interval(hits, samples, confidence)
+            converged = bool(samples >= min_samples and 0.5 * (high - low) <= tol)
+            yield HitEstimate(hits / samples, low, high, hits, samples, converged)
+            if converged:
+                return
+    finally:
+        if submit:
+            for _, future in pending:
+                future.cancel()
+
+
+def hit_probability(*scenario, **kwargs):
+    """Final :class:`HitEstimate` of :func:`iter_hit_probability`, or
+    ``None`` when there is no firing solution."""
+    estimate = None
+    for estimate in iter_hit_probability(*scenario, **kwargs):
+        pass
+    return estimate
@@ -0,0 +1,116 @@
+"""Worker pool for dashboard solves that keeps only each session's latest request.
+
+Callbacks hand their solve to :meth:`LatestRequestPool.run` together with a
+session id and block until it finishes, so the web server's request threads
+never run the CPU-heavy work themselves and the number of solves in flight
+stays bounded by the pool size. When a newer request arrives from the same
+session, the older one is cancelled if it has not started yet, or has its
+result discarded if it has; either way its caller gets :class:`Superseded`
+instead of a stale answer.
+
+The executor is created on first use, so servers that fork their workers
+(gunicorn and friends) each get their own pool after forking.
+"""
+import concurrent.futures
+import os
+import threading
+
+# Worker processes per server process; 0 runs solves inline in the caller.
+# Override with AIM_POOL_WORKERS.
+DEFAULT_WORKERS = int(os.environ.get('AIM_POOL_WORKERS', os.cpu_count() or 1))
+
+
+class Superseded(Exception):
+    """A newer request from the same session replaced this one."""
+
+
+class LatestRequestPool:
+    """Process (or thread) pool with per-session cancellation of stale work."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, kind='process'):
+        if kind not in ('process', 'thread'):
+            raise ValueError("kind must be 'process' or 'thread'")
+        self.workers = workers
+        self.kind = kind
+        self.completed = 0
+        self.cancelled = 0
+        self.superseded = 0
+        self._executor = None
+        self._generation = 0
+        # session -> (generation, future) of its newest request
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Called with the lock held
+        if self._executor is None:
+            executor = (concurrent.futures.ProcessPoolExecutor if self.kind == 'process'
+                        else concurrent.futures.ThreadPoolExecutor)
+            self._executor = executor(self.workers)
+        return self._executor
+
+    def _inline(self, fn, args):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run(self, session, fn, *args, timeout=None):
+        """Run ``fn(*args)`` in the pool and return its result.
+
+        Raises :class:`Superseded` if another call for ``session`` started
+        while this one was queued or running.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            previous = self._latest.get(session)
+            future = self._get_executor().submit(fn, *args) if self.workers else None
+            self._latest[session] = (generation, future)
+        if previous is not None and previous[1] is not None and previous[1].cancel():
+            with self._lock:
+                self.cancelled += 1
+
+        if future is None:
+            future = self._inline(fn, args)
+        try:
+            result = future.result(timeout)
+        except concurrent.futures.CancelledError:
+            raise Superseded() from None
+
+        with self._lock:
+            if self._latest.get(session, (None,))[0] != generation:
+                self.superseded += 1
+                raise Superseded()
+            del self._latest[session]
+            self.completed += 1
+        return result
+
+    def submit(self, fn, *args):
+        """Schedule ``fn(*args)`` on the pool outside any session; returns a future.
+
+        For jobs split into chunks that the caller collects and cancels
+        itself. With no workers the chunk runs inline.
+        """
+        if not self.workers:
+            return self._inline(fn, args)
+        with self._lock:
+            return self._get_executor().submit(fn, *args)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'kind': self.kind,
+                'in_flight': len(self._latest),
+                'completed': self.completed,
+                'cancelled': self.cancelled,
+                'superseded': self.superseded,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,173 @@
+"""Stateless aim solver shared by the dashboards and their workers.
+
+:class:`AimSolver` bundles everything a solve needs, fixed once at
+construction: the physics model, the drag constant, the solver tolerances
+and the precomputed table with its interpolation grids. ``solve`` keeps no
+state between calls, so one instance serves every thread, request and
+session; a caller that has a nearby earlier answer passes it in as a warm
+start.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from aiming.ballistics import K_DRAG, bullet_position
+from aiming.batch import REASONS, solve_batch
+from aiming.flight import DEFAULT_ALTITUDE, DEFAULT_STEPS, drag_constant, integrate, solve_flight
+from aiming.table import AimTable, get_table
+
+# Physics models: 'drag' is the closed-form straight-line flight at sea-level
+# density that the table is built for; 'gravity' integrates aiming.flight.
+# Pick the default with AIM_PHYSICS.
+MODELS = ('drag', 'gravity')
+DEFAULT_MODEL = os.environ.get('AIM_PHYSICS', 'drag')
+
+# Time samples of a bullet path from launch to impact
+PATH_SAMPLES = 128
+
+
+class AimSolution(namedtuple('AimSolution', 't phi converged iterations residual reason',
+                             defaults=(0, float('nan'), ''))):
+    """Intercept time (s), launch angle (rad) and whether the solve converged,
+    with its diagnostics: Newton iterations, the final miss distance (m) and
+    why the iteration stopped (one of :data:`aiming.batch.REASONS`)."""
+
+    __slots__ = ()
+
+    @property
+    def degrees(self):
+        return np.degrees(self.phi)
+
+    @property
+    def status(self):
+        """One-line account of the solve for display."""
+        if not self.converged:
+            return f'No firing solution: {self.reason} (closest miss {self.residual:.1f} m)'
+        if self.iterations == 0:
+            return f'Answered from the precomputed table (miss {self.residual:.2g} m)'
+        return (f'Converged in {self.iterations} iteration{"s" * (self.iterations != 1)} '
+                f'(miss {self.residual:.2g} m)')
+
+
+class AimSolver:
+    """Table-backed aim solver; see the module docstring.
+
+    ``table`` may be an :class:`AimTable`, a table path, ``None`` for the
+    process-wide default table, or ``False`` to always solve live. The table
+    is only used with the drag model and the drag constant it was built
+    for. The gravity model solves with :func:`aiming.flight.solve_flight` at
+    the given bomber ``altitude``, integrating ``steps`` RK4 steps per
+    trajectory.
+    """
+
+    def __init__(self, table=None, k=K_DRAG, tol=1e-6, max_iter=50, model=DEFAULT_MODEL,
+                 altitude=DEFAULT_ALTITUDE, steps=DEFAULT_STEPS):
+        if model not in MODELS:
+            raise ValueError(f'model must be one of {MODELS}, not {model!r}')
+        if model != 'drag':
+            table = False
+        if table is None:
+            table = get_table()
+        elif isinstance(table, str):
+            table = AimTable(table)
+        if table is not False and (not table.fresh or k != K_DRAG):
+            table = False
+        self.table = table or None
+        self.k = k
+        self.tol = tol
+        self.max_iter = max_iter
+        self.model = model
+        self.altitude = altitude
+        self.steps = steps
+
+    def solve_many(self, d, initial_fighter_y, v_bullet, v_bomber, v_fighter, t0=None,
+                   phi0=None, info=False):
+        """Arrays ``(t, phi, converged)`` for broadcast scenario arrays.
+
+        ``t0``/``phi0`` warm-start live solves; table answers ignore them.
+        ``info=True`` appends a :class:`aiming.batch.SolveInfo`.
+        """
+        if self.model == 'gravity':
+            return solve_flight(d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                                t0=t0, phi0=phi0, tol=self.tol, max_iter=self.max_iter,
+                                altitude=self.altitude, steps=self.steps, info=info)
+        if self.table is not None:
+            return self.table.lookup(d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                                     info=info, tol=self.tol, max_iter=self.max_iter)
+        return solve_batch(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, t0=t0,
+                           phi0=phi0, tol=self.tol, max_iter=self.max_iter, k=self.k, info=info)
+
+    def solve(self, d, initial_fighter_y, v_bullet, v_bomber, v_fighter, previous=None):
+        """Solve a single scenario; returns an :class:`AimSolution`.
+
+        ``previous`` is a ``(scenario, solution)`` pair for a nearby scenario,
+        such as the last slider position, to warm-start from. Live drag solves
+        begin at the previous answer, which saves about a Newton iteration
+        over the line-of-sight guess for a one-step slider nudge (a table
+        lookup ignores it and starts from the table, which is closer still).
+        Gravity solves begin at this scenario's drag solution shifted by the
+        previous gravity-vs-drag offset, which is usually within a Newton step
+        of the answer. If a warm start fails to converge, the scenario is
+        solved again from the default guess, and the iterations of both
+        attempts are counted.
+        """
+        scenario = (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+        t0, phi0 = self._warm_start(scenario, previous) if previous is not None else (None, None)
+        t, phi, converged, info = self.solve_many(*scenario, t0=t0, phi0=phi0, info=True)
+        solution = AimSolution(float(t), float(phi), bool(converged), int(info.iterations),
+                               float(info.residual), REASONS[int(info.reason)])
+        if t0 is not None and not converged:
+            retry = self.solve(*scenario)
+            return retry._replace(iterations=retry.iterations + solution.iterations)
+        return solution
+
+    def _warm_start(self, scenario, previous):
+        before, solution = previous
+        if not solution.converged:
+            return None, None
+        if self.model == 'drag':
+            if self.table is not None:
+                # The table would ignore the guess, and a retry repeat its lookup
+                return None, None
+            return solution.t, solution.phi
+        # Drag solutions of both scenarios in one batch
+        t, phi, converged = solve_batch(*np.array([before, scenario], dtype=float).T,
+                                        k=float(drag_constant(self.altitude)))
+        if not converged.all():
+            return None, None
+        return t[1] + solution.t - t[0], phi[1] + solution.phi - phi[0]
+
+    def path(self, solution, v_bullet, v_bomber, samples=PATH_SAMPLES):
+        """Ground-frame bullet positions ``(x, y)`` from launch to impact.
+
+        Under gravity the path is integrated with ``samples`` RK4 steps and
+        has ``samples + 1`` points evenly spaced in time. Under the drag model
+        the bullet flies straight along its launch velocity, so launch and
+        impact point describe it exactly.
+        """
+        ux = v_bomber + v_bullet * np.cos(solution.phi)
+        uy = v_bullet * np.sin(solution.phi)
+        if self.model == 'gravity':
+            x, y, _, _ = integrate(solution.t, ux, uy, self.altitude, samples, path=True)
+            return x, y
+        speed = np.hypot(ux, uy)
+        r = bullet_position(np.array([0.0, solution.t]), speed, self.k)
+        return r * ux / speed, r * uy / speed
+
+
+_default_solver = None
+
+
+def get_solver():
+    """Process-wide solver instance, created on first use."""
+    global _default_solver
+    if _default_solver is None:
+        _default_solver = AimSolver()
+    return _default_solver
+
+
+def solve_scenario(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
+    """:meth:`AimSolver.solve` with the process-wide solver; a module-level
+    function for worker processes."""
+    return get_solver().solve(d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
@@ -0,0 +1,253 @@
+"""Precomputed aiming solutions over the dashboard slider grid.
+
+``build_table`` tabulates (t, phi) with :func:`aiming.batch.solve_batch` and
+writes two files next to each other:
+
+    <path>.npy       float32 array of shape (*axis lengths, 2), memory-mapped
+                     on load; non-converged cells hold NaN
+    <path>.meta.npz  axes, drag constant and format version
+
+``AimTable.lookup`` starts Newton's method from the table: the stored node
+on exact grid hits, a multilinear interpolation between nodes otherwise.
+The float32 table is within a fraction of a metre of the answer, so one
+Newton step usually brings the miss below the solver tolerance, against
+four or so from the solver's default guess. Queries that fall outside the
+table, touch a non-converged cell or hit a stale/missing table go to the
+live solver instead. Single scenarios, the dashboards' case, take a scalar
+path that reads only the cell corners they need and iterates on Python
+floats, skipping the array set-up that dominates a one-element solve.
+
+Build the default table with ``python -m aiming.table``.
+"""
+import bisect
+import math
+import os
+
+import numpy as np
+
+from aiming.ballistics import K_DRAG
+from aiming.batch import CONVERGED, SolveInfo, _newton_step, residuals, solve_batch
+
+TABLE_VERSION = 1
+
+# Parameter order used throughout the table
+PARAMS = ('d', 'initial_fighter_y', 'v_bullet', 'v_bomber', 'v_fighter')
+
+# The distance axes follow the slider steps exactly. The velocity axes use the
+# slider marks (steps of 50); the full slider resolution would need ~380 MB,
+# and polishing interpolated answers keeps off-node values exact anyway.
+TABLE_AXES = {
+    'd': np.arange(100, 2001, 100, dtype=float),
+    'initial_fighter_y': np.arange(100, 2001, 50, dtype=float),
+    'v_bullet': np.arange(500, 1001, 50, dtype=float),
+    'v_bomber': np.arange(50, 301, 50, dtype=float),
+    'v_fighter': np.arange(50, 501, 50, dtype=float),
+}
+
+DEFAULT_PATH = os.environ.get(
+    'AIM_TABLE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 'aim_table'))
+
+
+def build_table(path=DEFAULT_PATH, axes=TABLE_AXES, chunk_size=200000):
+    """Solve every grid node and write the table files. Returns the array."""
+    axes = [np.asarray(axes[name], dtype=float) for name in PARAMS]
+    shape = tuple(len(a) for a in axes)
+    table = np.full(shape + (2,), np.nan, dtype=np.float32)
+
+    flat = table.reshape(-1, 2)
+    n = flat.shape[0]
+    for start in range(0, n, chunk_size):
+        idx = np.unravel_index(np.arange(start, min(start + chunk_size, n)), shape)
+        t, phi, converged = solve_batch(*(a[i] for a, i in zip(axes, idx)))
+        flat[start:start + t.size, 0] = np.where(converged, t, np.nan)
+        flat[start:start + t.size, 1] = np.where(converged, phi, np.nan)
+
+    np.save(path + '.npy', table)
+    np.savez(path + '.meta.npz', version=TABLE_VERSION, k=K_DRAG,
+             **{name: a for name, a in zip(PARAMS, axes)})
+    return table
+
+
+class AimTable:
+    """Read-only view of a precomputed table with live-solver fallback."""
+
+    def __init__(self, path=DEFAULT_PATH, polish_tol=1e-6, max_iter=50):
+        self.path = path
+        self.polish_tol = polish_tol
+        self.max_iter = max_iter
+        self.axes = None
+        self.data = None
+        self.stale_reason = None
+        self._load()
+
+    @property
+    def fresh(self):
+        return self.data is not None
+
+    def _load(self):
+        try:
+            meta = np.load(self.path + '.meta.npz')
+            data = np.load(self.path + '.npy', mmap_mode='r')
+        except (OSError, ValueError) as e:
+            self.stale_reason = f'table not readable: {e}'
+            return
+
+        axes = [meta[name] for name in PARAMS]
+        if int(meta['version']) != TABLE_VERSION:
+            self.stale_reason = 'table format version changed'
+        elif not np.isclose(float(meta['k']), K_DRAG, rtol=1e-12, atol=0):
+            self.stale_reason = 'drag constants changed'
+        elif data.shape != tuple(len(a) for a in axes) + (2,):
+            self.stale_reason = 'table shape does not match its axes'
+        else:
+            self.axes = axes
+            self.data = data
+            self._flat = data.reshape(-1, 2)
+            shape = data.shape[:-1]
+            self._strides = np.array(
+                [int(np.prod(shape[dim + 1:])) for dim in range(len(shape))])
+            self._corner_bits = (np.arange(1 << len(shape))[:, None]
+                                 >> np.arange(len(shape))) & 1
+            self._corner_offsets = self._corner_bits @ self._strides
+            self._axis_lists = [a.tolist() for a in axes]
+
+    def _interpolate(self, q):
+        # Multilinear interpolation over the 2**5 cell corners. Returns NaN for
+        # queries outside the grid or touching a non-converged node.
+        n = q[0].size
+        base = np.zeros(n, dtype=np.intp)
+        weights = np.ones((n, self._corner_bits.shape[0]))
+        inside = np.ones(n, dtype=bool)
+        for dim, (a, x) in enumerate(zip(self.axes, q)):
+            inside &= (x >= a[0]) & (x <= a[-1])
+            i = np.clip(np.searchsorted(a, x, side='right') - 1, 0, len(a) - 2)
+            frac = np.clip((x - a[i]) / (a[i + 1] - a[i]), 0.0, 1.0)
+            base += i * self._strides[dim]
+            weights *= np.where(self._corner_bits[:, dim], frac[:, None],
+                                1.0 - frac[:, None])
+
+        # Corners with zero weight are skipped so that exact grid hits never
+        # pick up a NaN neighbour
+        values = self._flat[base[:, None] + self._corner_offsets]
+        values = np.where(weights[..., None] > 0, values, 0.0)
+        out = np.einsum('nc,nck->nk', weights, values)
+        out[~inside] = np.nan
+        return out[:, 0], out[:, 1]
+
+    def _interpolate_scalar(self, q):
+        # Scalar _interpolate over the corners with non-zero weight only: one
+        # node on exact grid hits, two per axis the query falls between.
+        # Returns None outside the grid or next to a non-converged node.
+        corners = [(0, 1.0)]
+        for a, x, stride in zip(self._axis_lists, q, self._strides.tolist()):
+            if not a[0] <= x <= a[-1]:
+                return None
+            i = min(bisect.bisect_right(a, x) - 1, len(a) - 2)
+            frac = (x - a[i]) / (a[i + 1] - a[i])
+            if frac == 0.0:
+                corners = [(base + i * stride, w) for base, w in corners]
+            elif frac == 1.0:
+                corners = [(base + (i + 1) * stride, w) for base, w in corners]
+            else:
+                corners = ([(base + i * stride, w * (1.0 - frac)) for base, w in corners] +
+                           [(base + (i + 1) * stride, w * frac) for base, w in corners])
+        values = self._flat[[base for base, _ in corners]].tolist()
+        t = sum(w * v[0] for (_, w), v in zip(corners, values))
+        phi = sum(w * v[1] for (_, w), v in zip(corners, values))
+        if not (math.isfinite(t) and math.isfinite(phi)):
+            return None
+        return t, phi
+
+    def _lookup_scalar(self, q, tol, max_iter):
+        # Single-scenario lookup, iterating like solve_batch on Python floats
+        guess = self._interpolate_scalar(q)
+        if guess is not None:
+            t, phi = guess
+            for iterations in range(max_iter + 1):
+                f1, f2, dt, dphi = _newton_step(t, phi, *q, K_DRAG)
+                miss = math.hypot(f1, f2)
+                if miss < tol and t > 0:
+                    phi = math.atan2(math.sin(phi), math.cos(phi))
+                    return t, phi, True, iterations, miss, CONVERGED
+                if iterations == max_iter:
+                    break
+                t_new = t - dt
+                t = t_new if t_new > 0 else 0.5 * t
+                phi = phi - max(-0.5, min(0.5, dphi))
+                if not (math.isfinite(t) and math.isfinite(phi)):
+                    break
+        # Off the table, or the polish failed: solve from the default guess
+        t, phi, converged, (iterations, miss, reason) = solve_batch(
+            *q, tol=tol, max_iter=max_iter, info=True)
+        return float(t), float(phi), bool(converged), int(iterations), float(miss), int(reason)
+
+    def lookup(self, d, initial_fighter_y, v_bullet, v_bomber, v_fighter, info=False,
+               tol=None, max_iter=None):
+        """Return ``(t_solution, phi_solution, converged)`` like solve_batch.
+
+        ``tol`` and ``max_iter`` default to the table's ``polish_tol`` and
+        ``max_iter``. With ``info=True`` a :class:`aiming.batch.SolveInfo`
+        is appended; answers needing no Newton step count zero iterations.
+        """
+        tol = self.polish_tol if tol is None else tol
+        max_iter = self.max_iter if max_iter is None else max_iter
+        scenario = (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+        if not self.fresh:
+            return solve_batch(*scenario, tol=tol, max_iter=max_iter, info=info)
+
+        if all(np.ndim(a) == 0 for a in scenario):
+            t, phi, converged, iterations, miss, reason = self._lookup_scalar(
+                [float(a) for a in scenario], tol, max_iter)
+            result = np.array(t), np.array(phi), np.array(converged)
+            if info:
+                result += (SolveInfo(np.array(iterations, dtype=np.int32), np.array(miss),
+                                     np.array(reason, dtype=np.uint8)),)
+            return result
+
+        q = np.broadcast_arrays(
+            *(np.asarray(a, dtype=float)
+              for a in (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)))
+        shape = q[0].shape
+        q = [a.ravel() for a in q]
+
+        t, phi = self._interpolate(q)
+        converged = np.isfinite(t) & np.isfinite(phi)
+        f1, f2 = residuals(np.where(converged, t, 1.0), np.where(converged, phi, 0.0), *q)
+        miss = np.hypot(f1, f2)
+        converged &= (miss < tol) & (t > 0)
+        iterations = np.zeros(t.size, dtype=np.int32)
+        reason = np.full(t.size, CONVERGED, dtype=np.uint8)
+
+        # Answers are polished from the table's guess; anything the table
+        # cannot answer (a NaN guess) is solved from scratch
+        redo = ~converged
+        if redo.any():
+            t[redo], phi[redo], converged[redo], polish = solve_batch(
+                *(a[redo] for a in q), t0=t[redo], phi0=phi[redo], tol=tol,
+                max_iter=max_iter, info=True)
+            iterations[redo], miss[redo], reason[redo] = polish
+        result = t.reshape(shape), phi.reshape(shape), converged.reshape(shape)
+        if info:
+            result += (SolveInfo(iterations.reshape(shape), miss.reshape(shape),
+                                 reason.reshape(shape)),)
+        return result
+
+
+_default_table = None
+
+
+def get_table():
+    """Process-wide table instance, loaded on first use."""
+    global _default_table
+    if _default_table is None:
+        _default_table = AimTable()
+    return _default_table
+
+
+if __name__ == '__main__':
+    table = build_table()
+    print(f'Wrote {DEFAULT_PATH}.npy: shape {table.shape}, '
+          f'{table.nbytes / 1e6:.1f} MB, '
+          f'{np.isfinite(table[..., 0]).mean():.1%} of nodes converged')
@@ -0,0 +1,173 @@
+/*
+ * Browser port of the aim solver for the Dash app's clientside mode
+ * (AIM_CLIENTSIDE=1 in bomber_aim_5.py).
+ *
+ * solveAim mirrors aiming.batch.solve_batch for a single scenario: the same
+ * closed-form drag range, analytic Jacobian, damping and tolerance. The
+ * clientside callback aiming.update_plot turns its answer into a Patch of
+ * the figure the server rendered once at page load, so slider moves never
+ * leave the browser.
+ *
+ * aiming.envelope_request is used in every mode: it passes slider values on
+ * to the server's envelope callback only while the envelope view is shown.
+ */
+(function () {
+    'use strict';
+
+    // Same constants as aiming/ballistics.py
+    var M_BULLET = 0.045;
+    var CD = 0.295;
+    var A = 0.000071;
+    var RHO = 1.225;
+    var K_DRAG = 0.5 * RHO * CD * A / M_BULLET;
+
+    var TOL = 1e-6;
+    var MAX_ITER = 50;
+
+    function solveAim(d, y, vb, vbomb, vf, k) {
+        k = k === undefined ? K_DRAG : k;
+        // Line-of-sight angle and the drag-corrected time to cover that range
+        var phi = Math.atan2(y, d);
+        var t = Math.expm1(k * Math.hypot(d, y)) / (k * (vb + vbomb * Math.cos(phi)));
+        var converged = false;
+        var iterations = 0;
+        var residual = NaN;
+        var reason = 'iteration limit reached';
+
+        for (var i = 0; i < MAX_ITER; i++) {
+            var cosPhi = Math.cos(phi);
+            var sinPhi = Math.sin(phi);
+            var ux = vbomb + vb * cosPhi;
+            var uy = vb * sinPhi;
+            var speed = Math.hypot(ux, uy);
+            var denom = 1 + k * speed * t;
+            var g = Math.log1p(k * speed * t) / k / speed;
+
+            var dgDt = 1 / denom;
+            var dSpeedDphi = -vbomb * vb * sinPhi / speed;
+            var dgDphi = dSpeedDphi * (t / denom - g) / speed;
+
+            var f1 = g * ux - d;
+            var f2 = g * uy - (y - vf * t);
+            residual = Math.hypot(f1, f2);
+            if (residual < TOL && t > 0) {
+                converged = true;
+                reason = 'converged';
+                break;
+            }
+            var j11 = dgDt * ux;
+            var j12 = dgDphi * ux - g * uy;
+            var j21 = dgDt * uy + vf;
+            var j22 = dgDphi * uy + g * vb * cosPhi;
+            var det = j11 * j22 - j12 * j21;
+            var dt = (f1 * j22 - f2 * j12) / det;
+            var dphi = Math.max(-0.5, Math.min(0.5, (j11 * f2 - j21 * f1) / det));
+
+            // Damped update: never step to t <= 0
+            var tNew = t - dt;
+            tNew = tNew > 0 ? tNew : 0.5 * t;
+            var phiNew = phi - dphi;
+            if (!isFinite(tNew) || !isFinite(phiNew)) {
+                reason = 'iteration diverged';
+                break;
+            }
+            t = tNew;
+            phi = phiNew;
+            iterations++;
+        }
+        return {t: t, phi: Math.atan2(Math.sin(phi), Math.cos(phi)), converged: converged,
+                iterations: iterations, residual: residual, reason: reason};
+    }
+
+    // Python's '%.2g' formatting, so statuses read the same as the server's
+    function formatG2(x) {
+        if (isNaN(x)) {
+            return 'nan';
+        }
+        if (!isFinite(x)) {
+            return x > 0 ? 'inf' : '-inf';
+        }
+        if (x === 0) {
+            return '0';
+        }
+        var parts = x.toExponential(1).split('e');
+        var exponent = Number(parts[1]);
+        if (exponent < -4 || exponent >= 2) {
+            var mantissa = parts[0].replace(/\.0$/, '');
+            var digits = String(Math.abs(exponent));
+            return mantissa + 'e' + (exponent < 0 ? '-' : '+') + (digits.length < 2 ? '0' : '') + digits;
+        }
+        return String(Number(x.toPrecision(2)));
+    }
+
+    // Same wording as AimSolution.status in aiming/solver.py
+    function solverStatus(sol) {
+        if (!sol.converged) {
+            return 'No firing solution: ' + sol.reason + ' (closest miss ' +
+                sol.residual.toFixed(1) + ' m)';
+        }
+        return 'Converged in ' + sol.iterations + ' iteration' + (sol.iterations === 1 ? '' : 's') +
+            ' (miss ' + formatG2(sol.residual) + ' m)';
+    }
+
+    function updatePlot(d, y, vb, vbomb, vf) {
+        var sol = solveAim(d, y, vb, vbomb, vf);
+        var t = sol.t;
+        var phi = sol.phi;
+
+        // Same geometry and trace order as aiming/figure.py
+        var bomberX = vbomb * t;
+        var impactY = y - vf * t;
+        var aimLength = d * 1.5 * 10;
+        var traces = [
+            [[0, bomberX], [0, 0]],                                        // Bomber Path
+            [[d, d], [y, impactY]],                                        // Fighter Path
+            [[0, d], [0, impactY]],                                        // Bullet Trajectory
+            [[0, aimLength * Math.cos(phi)], [0, aimLength * Math.sin(phi)]], // Aiming Direction
+            [[0], [0]],                                                    // Initial Bomber
+            [[bomberX], [0]],                                              // Impact Bomber
+            [[d], [y]],                                                    // Initial Fighter
+            [[d], [impactY]]                                               // Impact Fighter
+        ];
+
+        var patch = new root.dash_clientside.Patch();
+        traces.forEach(function (xy, i) {
+            patch.assign(['data', i, 'x'], xy[0]);
+            patch.assign(['data', i, 'y'], xy[1]);
+        });
+        var degrees = phi * 180 / Math.PI;
+        patch.assign(['layout', 'title', 'text'], sol.converged
+            ? 'Aiming Angle: ' + degrees.toFixed(2) + ' degrees' : solverStatus(sol));
+        patch.assign(['layout', 'xaxis', 'range'], [-10, d * 1.1]);
+        patch.assign(['layout', 'yaxis', 'range'], [Math.min(impactY * 1.2, -100), y * 1.2]);
+
+        var maxX = d * 1.1 + 10;
+        var maxY = y * 1.2 - Math.min(impactY, -100);
+        var style = {
+            width: '100vw',
+            height: Math.max(Math.min(maxY / maxX * 100, 100), 50) + 'vh'
+        };
+        return [patch.build(), style, solverStatus(sol)];
+    }
+
+    // Slider values for the server's envelope callback, sent only while the
+    // envelope view is shown
+    function envelopeRequest(view, d, y, vb, vbomb, vf) {
+        if (view !== 'envelope') {
+            return root.dash_clientside.no_update;
+        }
+        return [d, y, vb, vbomb, vf];
+    }
+
+    // Extend the namespace object in place; the Dash renderer keeps a
+    // reference to it
+    var root = typeof window !== 'undefined' ? window : globalThis;
+    root.dash_clientside = root.dash_clientside || {};
+    root.dash_clientside.aiming = {update_plot: updatePlot, solve_aim: solveAim,
+                                   envelope_request: envelopeRequest};
+
+    if (typeof module !== 'undefined') {
+        module.exports = {solveAim: solveAim, solverStatus: solverStatus,
+                          envelopeRequest: envelopeRequest, K_DRAG: K_DRAG};
+    }
+})();
@@ -0,0 +1,150 @@
+"""Run many headless game episodes in parallel for difficulty sweeps.
+
+Every combination of aiming policy and difficulty-curve parameters is played
+for a number of seeded episodes, fanned out over a process pool. Each
+episode's seed depends only on the base seed and its position in the sweep,
+so results do not depend on the worker count or scheduling order.
+
+Example:
+
+    python batch_runner.py --episodes 200 --policy tracking lead \\
+        --speed-ramp 0.005 0.01 0.02 --spawn-ramp 0.05 0.1 --out sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from game import Difficulty, Game
+from engine.autoaim import AutoAimInput
+from engine.inputs import RandomInput, TrackingInput
+
+# Aiming policies by name; each factory gets the episode seed
+POLICIES = {
+    'tracking': lambda seed: TrackingInput(),
+    'lead': lambda seed: TrackingInput(lead_time=0.15),
+    'random': lambda seed: RandomInput(seed=seed),
+    'auto': lambda seed: AutoAimInput(),
+}
+
+RESULT_DTYPE = np.dtype([
+    ('episode', np.int64),
+    ('seed', np.int64),
+    ('policy', 'U16'),
+    ('speed_base', np.float64),
+    ('speed_ramp', np.float64),
+    ('spawn_base', np.float64),
+    ('spawn_ramp', np.float64),
+    ('spawn_min', np.float64),
+    ('score', np.int64),
+    ('frames', np.int64),
+    ('survival_time', np.float64),
+    ('game_over', np.bool_),
+    ('shots', np.int64),
+    ('wall_time', np.float64),
+    ('fps', np.float64),
+])
+
+
+def make_tasks(episodes, policies=('tracking',), seed=0, **difficulty_grid):
+    """Expand a sweep into one task per episode.
+
+    ``difficulty_grid`` maps Difficulty parameter names to sequences of
+    values; every combination is played ``episodes`` times per policy.
+    """
+    names = sorted(difficulty_grid)
+    tasks = []
+    for policy in policies:
+        for values in itertools.product(*(difficulty_grid[name] for name in names)):
+            for _ in range(episodes):
+                episode = len(tasks)
+                tasks.append({
+                    'episode': episode,
+                    'seed': seed + episode,
+                    'policy': policy,
+                    'difficulty': dict(zip(names, values)),
+                })
+    return tasks
+
+
+def run_task(task, max_time=300.0, dt=1.0 / 60):
+    """Play one episode and return its result row as a tuple."""
+    difficulty = Difficulty(**task['difficulty'])
+    game = Game(headless=True, use_arrays=False, dt=dt, difficulty=difficulty,
+                input_source=POLICIES[task['policy']](task['seed']), seed=task['seed'])
+    stats = game.run_episode(max_time=max_time)
+    return (task['episode'], task['seed'], task['policy'],
+            difficulty.speed_base, difficulty.speed_ramp,
+            difficulty.spawn_base, difficulty.spawn_ramp, difficulty.spawn_min,
+            stats['score'], stats['frames'], stats['sim_time'], stats['game_over'],
+            stats['shots'], stats['wall_time'], stats['fps'])
+
+
+def _run_task_star(args):
+    return run_task(*args)
+
+
+def run_batch(tasks, workers=None, max_time=300.0, dt=1.0 / 60, chunksize=None):
+    """Run all tasks on a process pool; returns a structured array by episode."""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(task, max_time, dt) for task in tasks]
+    if workers == 1:
+        rows = [_run_task_star(job) for job in jobs]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(jobs) // (workers * 8))
+        with multiprocessing.Pool(workers) as pool:
+            rows = list(pool.imap_unordered(_run_task_star, jobs, chunksize))
+    results = np.array(rows, dtype=RESULT_DTYPE)
+    results.sort(order='episode')
+    return results
+
+
+def save_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(results.dtype.names)
+        writer.writerows(results.tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--episodes', type=int, default=100,
+                        help='episodes per policy and difficulty combination')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', nargs='+', default=['tracking'], choices=sorted(POLICIES))
+    parser.add_argument('--max-time', type=float, default=300.0,
+                        help='simulated seconds before an episode is cut off')
+    parser.add_argument('--dt', type=float, default=1.0 / 60)
+    defaults = Difficulty()
+    for name in ('speed_base', 'speed_ramp', 'spawn_base', 'spawn_ramp', 'spawn_min'):
+        parser.add_argument('--' + name.replace('_', '-'), dest=name, nargs='+', type=float,
+                            default=[getattr(defaults, name)])
+    parser.add_argument('--out', default='batch_results.csv',
+                        help='CSV file; a .npy with the same rows is written alongside')
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.episodes, args.policy, args.seed,
+                       speed_base=args.speed_base, speed_ramp=args.speed_ramp,
+                       spawn_base=args.spawn_base, spawn_ramp=args.spawn_ramp,
+                       spawn_min=args.spawn_min)
+    start = time.perf_counter()
+    results = run_batch(tasks, args.workers, args.max_time, args.dt)
+    elapsed = time.perf_counter() - start
+
+    save_csv(results, args.out)
+    np.save(os.path.splitext(args.out)[0] + '.npy', results)
+    print(f'{len(results)} episodes in {elapsed:.1f} s '
+          f'({len(results) / elapsed * 60:.0f} episodes/min), '
+          f'{results["frames"].sum() / elapsed:.0f} simulated frames/s')
+    print(f'mean score {results["score"].mean():.2f}, '
+          f'mean survival {results["survival_time"].mean():.1f} s -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
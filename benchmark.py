@@ -0,0 +1,348 @@
+"""Benchmarks for the aiming math, the game tick, drawing and dashboard figures.
+
+Every workload is built from a fixed seed, timed over many samples and
+summarised as percentiles plus throughput. Results are written as JSON and
+can be compared against a stored baseline, flagging any benchmark whose
+median got slower than the allowed threshold.
+
+    python benchmark.py                                  # run everything
+    python benchmark.py --filter game                    # only matching names
+    python benchmark.py --save-baseline                  # store bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json   # compare, exit 1 on regression
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+DEFAULT_OUT = 'bench_results.json'
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+# Benchmarks register themselves here as name -> (setup, number)
+BENCHMARKS = {}
+
+
+def benchmark(name, number=1):
+    """Register ``setup(rng)``, which returns the callable to time.
+
+    ``number`` calls of that callable make up one sample, so very fast
+    operations are not dominated by timer overhead.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return register
+
+
+def random_scenarios(rng, n):
+    # Slider-grid scenarios (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+    return (rng.choice(np.arange(100, 2001, 100), n).astype(float),
+            rng.choice(np.arange(100, 2001, 50), n).astype(float),
+            rng.choice(np.arange(500, 1001, 10), n).astype(float),
+            rng.choice(np.arange(50, 301, 10), n).astype(float),
+            rng.choice(np.arange(50, 501, 10), n).astype(float))
+
+
+@benchmark('ballistics.bullet_position_function', number=100)
+def bench_bullet_position(rng):
+    from aiming.ballistics import bullet_position
+    t = rng.uniform(0.1, 5.0)
+    v0 = rng.uniform(500, 1000)
+    return lambda: bullet_position(t, v0)
+
+
+@benchmark('ballistics.bullet_position_numerical')
+def bench_bullet_position_numerical(rng):
+    from aiming.ballistics import bullet_position_numerical
+    t = rng.uniform(0.1, 5.0)
+    v0 = rng.uniform(500, 1000)
+    return lambda: bullet_position_numerical(t, v0)
+
+
+@benchmark('solver.calculate_trajectory_table', number=10)
+def bench_table_lookup(rng):
+    from aiming.table import get_table
+    table = get_table()
+    scenario = [a[0] for a in random_scenarios(rng, 1)]
+    return lambda: table.lookup(*scenario)
+
+
+@benchmark('solver.calculate_trajectory_live', number=10)
+def bench_live_solve(rng):
+    from aiming.batch import solve_aim
+    scenario = [a[0] for a in random_scenarios(rng, 1)]
+    return lambda: solve_aim(*scenario)
+
+
+@benchmark('solver.solve_batch_10k')
+def bench_solve_batch(rng):
+    from aiming.batch import solve_batch
+    scenarios = random_scenarios(rng, 10000)
+    return lambda: solve_batch(*scenarios)
+
+
+@benchmark('solver.solve_flight_1k')
+def bench_solve_flight(rng):
+    from aiming.flight import solve_flight
+    scenarios = random_scenarios(rng, 1000)
+    return lambda: solve_flight(*scenarios)
+
+
+@benchmark('montecarlo.count_hits_100k')
+def bench_count_hits(rng):
+    from aiming.batch import solve_aim
+    from aiming.montecarlo import count_hits
+    scenario = [a[0] for a in random_scenarios(rng, 1)]
+    aim = solve_aim(*scenario)[:2]
+    seed = int(rng.integers(1 << 31))
+    return lambda: count_hits(seed, 100000, scenario, aim)
+
+
+@benchmark('solver.envelope_201x201')
+def bench_envelope(rng):
+    from aiming.envelope import solve_envelope
+    velocities = [a[0] for a in random_scenarios(rng, 1)][2:]
+    return lambda: solve_envelope(*velocities)
+
+
+def _populated_game(rng, entities, use_arrays):
+    import game as game_module
+    game = game_module.Game(headless=True, use_arrays=use_arrays,
+                            seed=int(rng.integers(1 << 31)))
+    # Half bullets scattered over the screen, half fighters
+    for _ in range(entities // 2):
+        game.turret_angle = rng.uniform(-math.pi, math.pi)
+        game.shoot()
+        x = rng.uniform(0, game_module.WIDTH)
+        y = rng.uniform(0, game_module.HEIGHT)
+        if use_arrays:
+            i = game.bullets.n - 1
+            game.bullets.x[i] = game.bullets.px[i] = x
+            game.bullets.y[i] = game.bullets.py[i] = y
+        else:
+            bullet = game.bullets[-1]
+            bullet.x = bullet.prev_x = x
+            bullet.y = bullet.prev_y = y
+    for _ in range(entities - entities // 2):
+        game.spawn_enemy(speed_mult=1.0)
+        x = rng.uniform(100, game_module.WIDTH)
+        if use_arrays:
+            i = game.enemies.n - 1
+            game.enemies.x[i] = game.enemies.px[i] = x
+        else:
+            game.enemies[-1].x = game.enemies[-1].prev_x = x
+    game.spawn_timer = math.inf
+    return game
+
+
+def _bench_game_update(entities, use_arrays):
+    def setup(rng):
+        # Every sample steps a freshly populated game, built between samples
+        # by ``refresh``, so entity counts stay put and only the update is timed
+        pending = [_populated_game(rng, entities, use_arrays)]
+
+        def run():
+            pending[0].update(1.0 / 60)
+        run.refresh = lambda: pending.__setitem__(0, _populated_game(rng, entities, use_arrays))
+        return run
+    return setup
+
+
+for _n in (10, 100, 1000):
+    benchmark(f'game.update_{_n}_objects')(_bench_game_update(_n, use_arrays=False))
+    benchmark(f'game.update_{_n}_arrays')(_bench_game_update(_n, use_arrays=True))
+
+
+def _formation_game(rng, fighters, turrets, use_arrays):
+    # A formation engaged with ``fighters`` fighters spread over the right
+    # part of the screen, a second or more away from the base
+    import game as game_module
+    from engine.inputs import TrackingInput
+    game = game_module.Game(headless=True, use_arrays=use_arrays, turrets=turrets,
+                            input_source=TrackingInput(), seed=int(rng.integers(1 << 31)))
+    for _ in range(fighters):
+        game.spawn_enemy(speed_mult=1.0)
+        x = rng.uniform(350, game_module.WIDTH)
+        if use_arrays:
+            i = game.enemies.n - 1
+            game.enemies.x[i] = game.enemies.px[i] = x
+        else:
+            game.enemies[-1].x = game.enemies[-1].prev_x = x
+    game.spawn_timer = math.inf
+    # Past the first frame, which matches every turret from scratch, and
+    # into steady firing
+    for _ in range(10):
+        game.step(1.0 / 60)
+    return game
+
+
+def _bench_formation(fighters, turrets, use_arrays):
+    def setup(rng):
+        # Whole frames (input, assignment, movement, collisions) of one game;
+        # it is rebuilt before its fighters reach the base
+        pending = [_formation_game(rng, fighters, turrets, use_arrays)]
+
+        def run():
+            pending[0].step(1.0 / 60)
+
+        def refresh():
+            if pending[0].frames >= 40:
+                pending[0] = _formation_game(rng, fighters, turrets, use_arrays)
+        run.refresh = refresh
+        return run
+    return setup
+
+
+benchmark('game.formation_500x20_objects')(_bench_formation(500, 20, use_arrays=False))
+benchmark('game.formation_500x20_arrays')(_bench_formation(500, 20, use_arrays=True))
+
+
+def _bench_game_draw(entities, use_arrays):
+    def setup(rng):
+        import game as game_module
+        game = _populated_game(rng, entities, use_arrays)
+        # Draw through a real (possibly dummy-driver) window
+        windowed = game_module.Game(use_arrays=use_arrays)
+        windowed.bullets, windowed.enemies = game.bullets, game.enemies
+        return windowed.draw
+    return setup
+
+
+for _n in (100, 1000):
+    benchmark(f'game.draw_{_n}_objects')(_bench_game_draw(_n, use_arrays=False))
+    benchmark(f'game.draw_{_n}_arrays')(_bench_game_draw(_n, use_arrays=True))
+
+
+@benchmark('dash.build_plot')
+def bench_build_plot(rng):
+    import bomber_aim_5
+    scenario = [a[0] for a in random_scenarios(rng, 1)]
+    return lambda: bomber_aim_5.build_plot(*scenario)
+
+
+@benchmark('dash.update_plot_cached', number=100)
+def bench_update_plot_cached(rng):
+    import bomber_aim_5
+    scenario = [a[0] for a in random_scenarios(rng, 1)]
+    bomber_aim_5.update_plot(*scenario)
+    return lambda: bomber_aim_5.update_plot(*scenario)
+
+
+def time_benchmark(name, repeat, seed, min_time=0.0):
+    setup, number = BENCHMARKS[name]
+    rng = np.random.default_rng(seed)
+    fn = setup(rng)
+    refresh = getattr(fn, 'refresh', None)
+
+    # Warm up imports, caches and lazily built tables
+    for _ in range(min(3, repeat)):
+        fn()
+        if refresh:
+            refresh()
+
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < repeat or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter_ns() - t0) / number)
+        if refresh:
+            refresh()
+
+    samples = np.array(samples) / 1e9
+    return {
+        'samples': len(samples),
+        'number': number,
+        'mean_s': float(samples.mean()),
+        'p50_s': float(np.percentile(samples, 50)),
+        'p90_s': float(np.percentile(samples, 90)),
+        'p99_s': float(np.percentile(samples, 99)),
+        'min_s': float(samples.min()),
+        'throughput_per_s': float(1.0 / samples.mean()),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Yield (name, ratio, regressed) for benchmarks present in both."""
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = result['p50_s'] / base['p50_s']
+        yield name, ratio, ratio > 1.0 + threshold
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:8.2f} {unit}'
+    return f'{seconds / 1e-9:8.0f} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help='only run benchmarks containing this text')
+    parser.add_argument('--repeat', type=int, default=50, help='samples per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.0,
+                        help='keep sampling each benchmark for at least this many seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--baseline', default=None, help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed fractional slowdown of the median before flagging')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'also write the results to {DEFAULT_BASELINE}')
+    args = parser.parse_args()
+
+    results = {}
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        try:
+            result = time_benchmark(name, args.repeat, args.seed, args.min_time)
+        except ImportError as e:
+            print(f'{name:40s} skipped ({e})')
+            continue
+        results[name] = result
+        print(f'{name:40s} p50 {format_time(result["p50_s"])}  '
+              f'p90 {format_time(result["p90_s"])}  p99 {format_time(result["p99_s"])}  '
+              f'{result["throughput_per_s"]:12.1f}/s')
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f'\nCompared with {args.baseline} (threshold +{args.threshold:.0%}):')
+        for name, ratio, regressed in compare(results, baseline, args.threshold):
+            regressions += regressed
+            flag = 'REGRESSION' if regressed else ''
+            print(f'{name:40s} {ratio:6.2f}x  {flag}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
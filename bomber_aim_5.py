@@ -1,206 +1,306 @@
+import functools
+import operator
 import os
+import threading
+import uuid
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
-import numpy as np
-from scipy.optimize import fsolve
-import plotly.graph_objs as go
-from scipy.integrate import solve_ivp
-import scipy.integrate as integrate
-from numpy import interp
-
-def bullet_position_function(t, v0 = 890):
-    ## This differential equation can be solved numerically to obtain the velocity as a function of time
-    # Constants  # initial velocity in m/s
-    m = 0.045  # mass in kg
-    Cd = 0.295  # drag coefficient
-    A = 0.000071  # cross-sectional area in m^2
-    rho = 1.225  # air density in kg/m^3
-
-    # Differential equation for velocity reduction
-    def velocity_reduction(t, v):
-        return - (0.5 * rho * v**2 * Cd * A) / m
-
-    # Time span (0 to 10 seconds)
-    t_span = (0, t)
-    # Initial condition
-    v_init = [v0]
-
-    # Solving the differential equation
-    sol = solve_ivp(velocity_reduction, t_span, v_init, t_eval=np.linspace(0, t, 500))
-
-    def bullet_velocity_function(t):
-        # global t_span, sol
-        # if t_span is None or sol is None:
-        #     raise ValueError("Solution values have not been computed yet.")    
-        # Create an interpolation function using the solution values
-        # Evaluate the interpolation function at the given time t
-        return interp(t, np.linspace(0, t, 500), sol.y[0])
-
-    result, error = integrate.quad(bullet_velocity_function, 0, t)
-    return result
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from dash.exceptions import PreventUpdate
+from aiming.cache import SolutionCache, scenario_key
+from aiming.envelope import envelope_shapes, solve_envelope
+from aiming.figure import FigureBuilder, figure_changes, plot_scenario
+from aiming.montecarlo import DEFAULT_DISPERSION, HIT_RADIUS, iter_hit_probability
+from aiming.pool import LatestRequestPool, Superseded
+from aiming.solver import DEFAULT_MODEL, solve_scenario
 
 app = dash.Dash(__name__)
 
-# App layout
-app.layout = html.Div([
-    html.H1("Aiming Angle Calculation for Bomber Turret Gunner to Hit the Fighter"),
-    dcc.Graph(id='trajectory-plot'),
-    html.Label("Horizontal Distance (m)"),
-    dcc.Slider(id='d', min=100, max=2000, step=100, value=500,
-               marks={i: str(i) for i in range(100, 2000, 500)}),
-    html.Label("Initial Fighter Y (m)"),
-    dcc.Slider(id='initial_fighter_y', min=100, max=2000, step=50, value=500,
-               marks={i: str(i) for i in range(100, 2001, 200)}),
-    html.Label("Bullet Velocity (m/s)"),
-    dcc.Slider(id='v_bullet', min=500, max=1000, step=10, value=890,
-               marks={i: str(i) for i in range(500, 1501, 100)}),
-    html.Label("Bomber Velocity (m/s)"),
-    dcc.Slider(id='v_bomber', min=50, max=300, step=10, value=100,
-               marks={i: str(i) for i in range(50, 301, 50)}),
-    html.Label("Fighter Velocity (m/s)"),
-    dcc.Slider(id='v_fighter', min=50, max=500, step=10, value=150,
-               marks={i: str(i) for i in range(50, 501, 50)})
-])
-
-@app.callback(
-    [Output('trajectory-plot', 'figure'),
-     Output('trajectory-plot', 'style')],
-    [Input('d', 'value'),
-     Input('initial_fighter_y', 'value'),
-     Input('v_bullet', 'value'),
-     Input('v_bomber', 'value'),
-     Input('v_fighter', 'value')]
-)
-def update_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
-    # Function to calculate the aiming angle and plot the trajectories
-    def calculate_trajectory(v_bullet, v_bomber, v_fighter, d, initial_fighter_y):
-        # Define the equations to solve for the time t and angle phi
-        def equations(vars):
-            t, phi = vars
-            v0_bullet_x = v_bomber + v_bullet * np.cos(phi)
-            v0_bullet_y = v_bullet * np.sin(phi)
-            v0_bullet_norm = (v0_bullet_x**2 + v0_bullet_y**2)**0.5
-            bullet_postion_norm = bullet_position_function(t, v0_bullet_norm)
-            x_bullet = bullet_postion_norm * v0_bullet_x / v0_bullet_norm
-            y_bullet = bullet_postion_norm * v0_bullet_y / v0_bullet_norm
-            x_fighter = d
-            y_fighter = initial_fighter_y - v_fighter * t
-            return [x_bullet - x_fighter, y_bullet - y_fighter]
-
-        # Initial guess for t and phi
-        initial_guess = [1.0, np.arctan(initial_fighter_y / d)]
-
-        # Solve the equations
-        solution = fsolve(equations, initial_guess)
-        t_solution, phi_solution = solution
-
-        # Convert the angle to degrees
-        theta_degrees = np.degrees(phi_solution)
-
-        # Generate time points for plotting the bullet trajectory
-        # t_total = np.linspace(0, t_solution, 100)
-        # x_bullet_trajectory = bullet_position_function(t_total, v0_bullet_norm)
-        # y_bullet_trajectory = v_bullet * np.sin(phi_solution) * t_total
-
-        # Calculate the aiming direction line based on phi_solution
-        aiming_line_length = d * 1.5  # Extend the aiming line for better visualization
-        aiming_line_x = [0, aiming_line_length * np.cos(phi_solution) * 10]
-        aiming_line_y = [0, aiming_line_length * np.sin(phi_solution) * 10]
-
-        return t_solution, phi_solution, theta_degrees, aiming_line_x, aiming_line_y
-
-    # Get the plot data and aiming angle
-    t_solution, phi_solution, theta_degrees, aiming_line_x, aiming_line_y = calculate_trajectory(
-        v_bullet, v_bomber, v_fighter, d, initial_fighter_y
-    )
-
-    # Plotting data
-    bomber_path = go.Scatter(x=[0, v_bomber * t_solution], y=[0, 0], 
-                             mode='lines', name='Bomber Path', line=dict(color='blue', width=3))
-    fighter_path = go.Scatter(x=[d, d], y=[initial_fighter_y, initial_fighter_y - v_fighter * t_solution], mode='lines', name='Fighter Path', line=dict(color='green', width=3))
-
-    bullet_trajectory = go.Scatter(
-        x=[0, d], y=[0, initial_fighter_y - v_fighter * t_solution], mode='lines', name='Bullet Trajectory', line=dict(color='red')
-    )
-
-    aiming_direction = go.Scatter(
-        x=aiming_line_x, y=aiming_line_y, mode='lines', name='Aiming Direction',
-        line=dict(dash='dot', color='orange')
-    )
-
-    # Points for initial and impact positions
-    # Unicode airplane symbols
-    airplane_symbols = ['✈️', '🛩️', '🛫', '🛬', '✈️']
-
-    initial_bomber_point = go.Scatter(
-        x=[0], y=[0],
-        mode='markers+text', name='✈️Initial Bomber Position', 
-        text='✈️', textfont=dict(size=20), textposition='middle center', 
-        marker=dict(color='blue', size=10, symbol='circle')
-    )
-
-    impact_bomber_point = go.Scatter(
-        x=[v_bomber * t_solution], y=[0],
-        mode='markers', name='Impact Bomber Position',
-        marker=dict(color='blue', size=10, symbol='x')
-    )
-
-    initial_fighter_point = go.Scatter(
-        x=[d], y=[initial_fighter_y],
-        mode='markers+text', name='🛩️Initial Fighter Position', 
-        text='🛩️', textfont=dict(size=20), textposition='middle center', 
-        marker=dict(color='green', size=10, symbol='square')
-    )
-
-    impact_fighter_y = initial_fighter_y - v_fighter * t_solution
-    impact_fighter_point = go.Scatter(
-        x=[d], y=[impact_fighter_y],
-        mode='markers', name='Impact Fighter Position',
-        marker=dict(color='green', size=10, symbol='x')
-    )
-
-    # Create the plot layout with larger plot area
-    layout = go.Layout(
-        title=f'Aiming Angle: {theta_degrees:.2f} degrees',
-        xaxis=dict(title='Horizontal Distance (m)', showgrid=True, range=[-10, d * 1.1],
-                   scaleanchor='y'),  # Ensure the x-axis is scaled to the y-axis),
-        yaxis=dict(title='Vertical Distance (m)', showgrid=True, range=[min(impact_fighter_y* 1.2, -100), initial_fighter_y * 1.2],
-                #    scaleratio=1
-                ),      # Same ratio for the y-axis to maintain equal scaling),
-        showlegend=True,
-        legend=dict(
-            orientation="h",  # Horizontal orientation
-            x=0,            # Center horizontally
-            y=-0.3,           # Position below the plot area
-            xanchor='left', # Anchor the x position at the center
-            yanchor='top'
-        ),
-        dragmode=False
-    )
-
-    # Calculate the new height based on the "d" value
-    max_x = d * 1.1 + 10
-    max_y = initial_fighter_y * 1.2 - min(impact_fighter_y, -100)
-    # Example scaling: adjust the divisor as needed
-    new_width = f"{100}vw" 
-    new_height = f"{max(min(max_y / max_x * 100, 100), 50)}vh"
-    # Update the style with the new height
-    new_style = {
-        'width': new_width,
-        'height': new_height
-    }
-
-    # Create the figure
-    figure = go.Figure(data=[bomber_path, fighter_path, bullet_trajectory, aiming_direction,
-                        initial_bomber_point, impact_bomber_point,
-                        initial_fighter_point, impact_fighter_point])
-
-    figure.update_layout(layout,
-                        uirevision=True)
-
-    return figure, new_style
+# With AIM_CLIENTSIDE=1 slider changes are solved in the browser by
+# assets/aim_solver.js and patched into the figure; the server only renders
+# the initial page. The browser port only has the drag model, so
+# AIM_PHYSICS=gravity keeps solving on the server.
+CLIENTSIDE = os.environ.get("AIM_CLIENTSIDE") == "1" and DEFAULT_MODEL == 'drag'
+
+# Slider values of a fresh page
+DEFAULTS = {'d': 500, 'initial_fighter_y': 500, 'v_bullet': 890, 'v_bomber': 100,
+            'v_fighter': 150}
+
+# WSGI entry point, e.g. `gunicorn bomber_aim_5:server --workers 4 --threads 8`
+server = app.server
+
+# Static part of every figure; only coordinates, title and ranges change.
+# Built on first use so the plotly theme is only loaded by a process that
+# renders figures
+figure_builder = None
+
+def get_figure_builder():
+    global figure_builder
+    if figure_builder is None:
+        import plotly.io as pio
+        figure_builder = FigureBuilder(layout=dict(
+            template=pio.templates[pio.templates.default].to_plotly_json(),
+            xaxis=dict(title=dict(text='Horizontal Distance (m)'), showgrid=True,
+                       scaleanchor='y'),  # Ensure the x-axis is scaled to the y-axis
+            yaxis=dict(title=dict(text='Vertical Distance (m)'), showgrid=True),
+            showlegend=True,
+            legend=dict(
+                orientation="h",  # Horizontal orientation
+                x=0,            # Center horizontally
+                y=-0.3,           # Position below the plot area
+                xanchor='left', # Anchor the x position at the center
+                yanchor='top'
+            ),
+            dragmode=False,
+            uirevision=True,
+        ), aim_line_scale=1.5 * 10)  # Extend the aiming line for better visualization
+    return figure_builder
+
+# Solved scenarios and their figures, shared by every callback in this process
+solution_cache = SolutionCache()
+
+# Engagement envelopes by grid shape and velocities; each holds about a MB
+envelope_cache = SolutionCache(maxsize=32)
+
+# The envelope view draws the coarsest grid first, then the finest one
+# warm-started from it
+ENVELOPE_COARSE, ENVELOPE_FINE = envelope_shapes()[0], envelope_shapes()[-1]
+
+# Hit-probability runs by session: (run id, result text, progress, finished).
+# Each run is a thread that solves the aim and feeds chunks of shots to the
+# solve pool; starting a
+# new run for the session stops the older one. Entries are dropped once a
+# finished run has been polled, and the oldest beyond HIT_RUNS_MAX (sessions
+# closed mid-run) when new runs start.
+hit_runs = {}
+hit_runs_lock = threading.Lock()
+HIT_RUNS_MAX = 256
+
+# Solves run here rather than on the request threads; a newer slider value
+# from the same browser session supersedes one still waiting or running
+solve_pool = LatestRequestPool()
+
+# App layout; built per page load so every session gets its own id
+def serve_layout():
+    # The default figure ships with the page; clientside mode patches it
+    initial = cached_plot(**DEFAULTS)
+    return html.Div([
+        dcc.Store(id='session-id', data=uuid.uuid4().hex),
+        # Scenario the browser's figure shows; slider updates patch from it
+        dcc.Store(id='plotted-scenario', data=list(DEFAULTS.values())),
+        html.H1("Aiming Angle Calculation for Bomber Turret Gunner to Hit the Fighter"),
+        dcc.RadioItems(id='view', value='scenario', inline=True, options=[
+            {'label': 'Scenario', 'value': 'scenario'},
+            {'label': 'Engagement envelope', 'value': 'envelope'}]),
+        html.Div([
+            dcc.Graph(id='trajectory-plot', figure=initial['figure'], style=initial['style']),
+            html.Div(initial['solution'].status, id='solver-status'),
+        ], id='scenario-view'),
+        html.Div([
+            dcc.Graph(id='envelope-plot', style={'width': '100vw', 'height': '90vh'}),
+            dcc.Store(id='envelope-request'),
+            dcc.Store(id='envelope-refine'),
+        ], id='envelope-view', style={'display': 'none'}),
+        html.Label("Horizontal Distance (m)"),
+        dcc.Slider(id='d', min=100, max=2000, step=100, value=DEFAULTS['d'],
+                   marks={i: str(i) for i in range(100, 2000, 500)}),
+        html.Label("Initial Fighter Y (m)"),
+        dcc.Slider(id='initial_fighter_y', min=100, max=2000, step=50, value=DEFAULTS['initial_fighter_y'],
+                   marks={i: str(i) for i in range(100, 2001, 200)}),
+        html.Label("Bullet Velocity (m/s)"),
+        dcc.Slider(id='v_bullet', min=500, max=1000, step=10, value=DEFAULTS['v_bullet'],
+                   marks={i: str(i) for i in range(500, 1501, 100)}),
+        html.Label("Bomber Velocity (m/s)"),
+        dcc.Slider(id='v_bomber', min=50, max=300, step=10, value=DEFAULTS['v_bomber'],
+                   marks={i: str(i) for i in range(50, 301, 50)}),
+        html.Label("Fighter Velocity (m/s)"),
+        dcc.Slider(id='v_fighter', min=50, max=500, step=10, value=DEFAULTS['v_fighter'],
+                   marks={i: str(i) for i in range(50, 501, 50)}),
+        html.H3("Hit Probability"),
+        html.P(f"Muzzle velocity spread {DEFAULT_DISPERSION.muzzle_velocity:g} m/s, "
+               f"angular dispersion {DEFAULT_DISPERSION.angle * 1e3:g} mrad, fighter speed "
+               f"uncertainty {DEFAULT_DISPERSION.fighter_speed:g} m/s, hit within {HIT_RADIUS:g} m."),
+        html.Button("Estimate hit probability", id='hit-button'),
+        html.Progress(id='hit-progress', value='0', max='1'),
+        html.Div(id='hit-result'),
+        dcc.Interval(id='hit-poll', interval=250, disabled=True),
+    ])
+
+
+def cached_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
+    key = scenario_key(d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+    return solution_cache.get_or_compute(
+        key, lambda: build_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter))
+
+def update_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, session_id=None,
+                plotted=None):
+    # Serve repeated slider positions from the process-wide cache; misses are
+    # solved in the pool, warm-started from the scenario on screen, and
+    # answers a newer request replaced are dropped
+    scenario = [d, initial_fighter_y, v_bullet, v_bomber, v_fighter]
+    key = scenario_key(*scenario)
+    previous = solution_cache.peek(scenario_key(*plotted)) if plotted else None
+    warm_start = (plotted, previous['solution']) if previous else None
+    try:
+        entry = solution_cache.get_or_compute(key, lambda: solve_pool.run(
+            session_id, functools.partial(plot_scenario, previous=warm_start),
+            get_figure_builder(), *scenario))
+    except Superseded:
+        raise PreventUpdate
+    return (figure_update(previous, entry['figure']), entry['style'],
+            entry['solution'].status, scenario)
+
+def figure_update(previous, figure):
+    # Patch only what differs from the figure the browser already shows, if
+    # that one is still cached; otherwise send the whole figure
+    changes = previous and figure_changes(previous['figure'], figure)
+    if changes is None:
+        return figure
+    patch = dash.Patch()
+    for path, value in changes:
+        functools.reduce(operator.getitem, path[:-1], patch)[path[-1]] = value
+    return patch
+
+plot_outputs = [Output('trajectory-plot', 'figure'), Output('trajectory-plot', 'style'),
+                Output('solver-status', 'children')]
+slider_inputs = [Input(name, 'value') for name in DEFAULTS]
+if CLIENTSIDE:
+    app.clientside_callback(ClientsideFunction(namespace='aiming', function_name='update_plot'),
+                            plot_outputs, slider_inputs, prevent_initial_call=True)
+else:
+    app.callback(plot_outputs + [Output('plotted-scenario', 'data')], slider_inputs,
+                 [State('session-id', 'data'), State('plotted-scenario', 'data')],
+                 prevent_initial_call=True)(update_plot)
+
+@app.callback(Output('scenario-view', 'style'), Output('envelope-view', 'style'),
+              Input('view', 'value'))
+def switch_view(view):
+    hidden = {'display': 'none'}
+    return (hidden, {}) if view == 'envelope' else ({}, hidden)
+
+def envelope_level(session_id, shape, v_bullet, v_bomber, v_fighter, start=None):
+    # Solve one envelope grid in the pool, or fetch it from the cache
+    key = (shape, scenario_key(0, 0, v_bullet, v_bomber, v_fighter))
+    return envelope_cache.get_or_compute(key, lambda: solve_pool.run(
+        (session_id, 'envelope'), functools.partial(solve_envelope, start=start),
+        v_bullet, v_bomber, v_fighter, shape))
+
+# The browser forwards slider moves to the server only while the envelope
+# view is shown, so hidden envelopes (and clientside mode) cost no requests
+app.clientside_callback(ClientsideFunction(namespace='aiming', function_name='envelope_request'),
+                        Output('envelope-request', 'data'), Input('view', 'value'),
+                        slider_inputs, prevent_initial_call=True)
+
+@app.callback(Output('envelope-plot', 'figure', allow_duplicate=True),
+              Output('envelope-refine', 'data'),
+              Input('envelope-request', 'data'), State('session-id', 'data'),
+              prevent_initial_call=True)
+def update_envelope(request, session_id=None):
+    # Draw the coarse grid at once and leave the fine one to refine_envelope,
+    # unless the fine grid for these velocities is already cached
+    d, initial_fighter_y, v_bullet, v_bomber, v_fighter = request
+    velocities = (v_bullet, v_bomber, v_fighter)
+    fine = envelope_cache.get((ENVELOPE_FINE, scenario_key(0, 0, *velocities)))
+    if fine is not None:
+        return get_figure_builder().build_envelope(fine, d, initial_fighter_y), dash.no_update
+    try:
+        coarse = envelope_level(session_id, ENVELOPE_COARSE, *velocities)
+    except Superseded:
+        raise PreventUpdate
+    return (get_figure_builder().build_envelope(coarse, d, initial_fighter_y),
+            {'scenario': [d, initial_fighter_y, *velocities]})
+
+@app.callback(Output('envelope-plot', 'figure'), Input('envelope-refine', 'data'),
+              State('session-id', 'data'), prevent_initial_call=True)
+def refine_envelope(refine, session_id=None):
+    d, initial_fighter_y, *velocities = refine['scenario']
+    try:
+        coarse = envelope_level(session_id, ENVELOPE_COARSE, *velocities)
+        fine = envelope_level(session_id, ENVELOPE_FINE, *velocities, start=coarse)
+    except Superseded:
+        raise PreventUpdate
+    return get_figure_builder().build_envelope(fine, d, initial_fighter_y)
+
+def publish_hit_run(session_id, run_id, text, progress, finished):
+    # Store a run's latest result unless a newer run replaced it; returns
+    # whether the run is still current
+    with hit_runs_lock:
+        if hit_runs.get(session_id, (None,))[0] != run_id:
+            return False
+        hit_runs[session_id] = (run_id, text, progress, finished)
+        return True
+
+def run_hit_estimate(session_id, run_id, scenario):
+    # Solve the aim in the pool, then publish every intermediate estimate
+    # until converged or superseded
+    try:
+        aim = solve_pool.run((session_id, 'hit'), solve_scenario, *scenario)
+    except Superseded:
+        return
+    if not aim.converged:
+        publish_hit_run(session_id, run_id, aim.status, 0.0, True)
+        return
+    estimates = iter_hit_probability(*scenario, submit=solve_pool.submit,
+                                     parallel=max(solve_pool.workers, 1), aim=aim)
+    for estimate in estimates:
+        text = (f"Hit probability {estimate.p:.1%} (95% confidence {estimate.low:.1%} to "
+                f"{estimate.high:.1%}) from {estimate.samples:,} shots")
+        if not publish_hit_run(session_id, run_id, text, estimate.progress(), False):
+            estimates.close()
+            return
+    publish_hit_run(session_id, run_id, text, 1.0, True)
+
+@app.callback(Output('hit-poll', 'disabled'), Output('hit-result', 'children'),
+              Input('hit-button', 'n_clicks'), *(State(name, 'value') for name in DEFAULTS),
+              State('session-id', 'data'), prevent_initial_call=True)
+def start_hit_estimate(n_clicks, d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                       session_id=None):
+    if not n_clicks:
+        raise PreventUpdate
+    run_id = uuid.uuid4().hex
+    with hit_runs_lock:
+        # Any older run of this session stops at its next chunk
+        hit_runs.pop(session_id, None)
+        hit_runs[session_id] = (run_id, None, 0.0, False)
+        while len(hit_runs) > HIT_RUNS_MAX:
+            hit_runs.pop(next(iter(hit_runs)))
+    threading.Thread(target=run_hit_estimate, daemon=True, args=(
+        session_id, run_id, (d, initial_fighter_y, v_bullet, v_bomber, v_fighter))).start()
+    return False, "Sampling shots..."
+
+@app.callback(Output('hit-result', 'children', allow_duplicate=True),
+              Output('hit-progress', 'value'),
+              Output('hit-poll', 'disabled', allow_duplicate=True),
+              Input('hit-poll', 'n_intervals'), State('session-id', 'data'),
+              prevent_initial_call=True)
+def poll_hit_estimate(n_intervals, session_id=None):
+    with hit_runs_lock:
+        _, text, progress, finished = hit_runs.get(session_id, (None, None, 0.0, False))
+        if finished:
+            del hit_runs[session_id]
+    if text is None:
+        raise PreventUpdate
+    return (text if finished else text + ", sampling..."), str(progress), finished
+
+def build_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
+    # Solve the scenario and fill in the figure template
+    return plot_scenario(get_figure_builder(), d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+
+# Served per page load; set here since it renders the default plot
+app.layout = serve_layout
+
+@app.server.route("/cache-stats")
+def cache_stats():
+    # Hit/miss counters of the solution cache
+    return solution_cache.stats()
+
+@app.server.route("/pool-stats")
+def pool_stats():
+    # Completed, cancelled and superseded solves of the worker pool
+    return solve_pool.stats()
 
 # Run the app
 if __name__ == "__main__":
-    app.run_server(host='0.0.0.0', port=int(os.environ.get("PORT", 8050)), debug=True)
\ No newline at end of file
+    # Development server; set DASH_DEBUG=1 for hot reloading and the debug UI
+    app.run(host='0.0.0.0', port=int(os.environ.get("PORT", 8050)),
+            debug=os.environ.get("DASH_DEBUG") == "1", threaded=True)
\ No newline at end of file
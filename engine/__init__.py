@@ -0,0 +1 @@
+"""Simulation support code for the Bomber Defense game in game.py."""
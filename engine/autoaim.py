@@ -0,0 +1,139 @@
+"""Drag-corrected lead aiming for the game turret.
+
+The game is the dashboards' intercept problem seen from a stationary bomber:
+the turret sits still, each fighter flies in a straight line, and the bullet
+flies straight and slows under quadratic drag. Rotating the screen by 90
+degrees, so that a fighter's velocity points along -y, turns every
+(turret, fighter) pair into a dashboard scenario with ``v_bomber = 0``:
+
+    d = -(fighter_y - turret_y)
+    initial_fighter_y = fighter_x - turret_x
+    v_fighter = -fighter_vx
+
+so :func:`aiming.batch.solve_batch` solves all fighters in one call. Each
+frame's solutions warm-start the next, matched by fighter id.
+"""
+import math
+
+import numpy as np
+
+from aiming.batch import solve_batch
+
+
+class InterceptAimer:
+    """Batched intercept solver for one turret, warm-started across frames."""
+
+    def __init__(self, turret_x, turret_y, bullet_speed, k, bounds,
+                 min_bullet_speed=10.0, max_iter=20):
+        self.turret_x = turret_x
+        self.turret_y = turret_y
+        self.bullet_speed = bullet_speed
+        self.k = k
+        self.width, self.height = bounds
+        self.min_bullet_speed = min_bullet_speed
+        self.max_iter = max_iter
+        self.clear()
+
+    def clear(self):
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._t = np.zeros(0)
+        self._angle = np.zeros(0)
+
+    def solve(self, ids, x, y, vx, dt=0.0):
+        """Intercept time, screen angle and feasibility for every fighter.
+
+        ``dt`` is the time since the previous call, used to age the warm
+        starts. A solution is feasible when the solver converged, the bullet
+        is still faster than ``min_bullet_speed`` on impact and the impact
+        point lies on screen.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        vx = np.asarray(vx, dtype=float)
+
+        # Warm start from last frame's answers for fighters seen before
+        t0 = np.full(ids.size, np.nan)
+        angle0 = np.full(ids.size, np.nan)
+        if self._ids.size and ids.size:
+            slot = np.clip(np.searchsorted(self._ids, ids), 0, self._ids.size - 1)
+            seen = self._ids[slot] == ids
+            t0[seen] = self._t[slot[seen]] - dt
+            angle0[seen] = self._angle[slot[seen]]
+
+        t, angle, converged, feasible = self.intercept(x, y, vx, t0, angle0)
+
+        order = np.argsort(ids)
+        self._ids = ids[order]
+        self._t = np.where(converged, t, np.nan)[order]
+        self._angle = np.where(converged, angle, np.nan)[order]
+        return t, angle, feasible
+
+    def intercept(self, x, y, vx, t0=None, angle0=None, turret_x=None, turret_y=None):
+        """Stateless core of :meth:`solve`: ``(t, angle, converged, feasible)``.
+
+        Arguments broadcast against each other, so a column of turret
+        positions against a row of fighters solves every pair at once.
+        ``turret_x``/``turret_y`` default to this aimer's turret, and
+        ``t0``/``angle0`` are optional warm starts (NaN where there is none).
+        """
+        turret_x = self.turret_x if turret_x is None else turret_x
+        turret_y = self.turret_y if turret_y is None else turret_y
+        phi0 = None if angle0 is None else np.asarray(angle0) + math.pi / 2
+        t, phi, converged = solve_batch(
+            -(y - turret_y), x - turret_x, self.bullet_speed, 0.0, -vx,
+            t0=t0, phi0=phi0, max_iter=self.max_iter, k=self.k)
+
+        impact_x = x + vx * t
+        speed_at_impact = self.bullet_speed / (1.0 + self.k * self.bullet_speed * t)
+        feasible = (converged & (t > 0) & (speed_at_impact >= self.min_bullet_speed) &
+                    (impact_x >= 0) & (impact_x <= self.width) &
+                    (y >= 0) & (y <= self.height))
+
+        # Back from the rotated dashboard frame to a screen angle
+        return t, phi - math.pi / 2, converged, feasible
+
+    def choose(self, ids, x, y, vx, dt=0.0):
+        """Pick the fighter with the earliest feasible intercept.
+
+        Returns ``(index, angle, t)`` or ``None`` if nothing can be hit.
+        """
+        if len(ids) == 0:
+            self.clear()
+            return None
+        t, angle, feasible = self.solve(ids, x, y, vx, dt)
+        if not feasible.any():
+            return None
+        i = int(np.argmin(np.where(feasible, t, np.inf)))
+        return i, float(angle[i]), float(t[i])
+
+
+class AutoAimInput:
+    """Input source that points the turret at the best intercept.
+
+    With ``auto_fire`` it also shoots every ``fire_interval`` seconds while a
+    target is feasible; otherwise firing is left to the player.
+    """
+
+    def __init__(self, auto_fire=True, fire_interval=0.1):
+        self.auto_fire = auto_fire
+        self.fire_interval = fire_interval
+        self.cooldown = 0.0
+        self.aimer = None
+        self.target = None
+
+    def poll(self, game):
+        if self.aimer is None:
+            self.aimer = game.intercept_aimer()
+        self.cooldown -= game.dt
+        ids, x, y, vx = game.enemy_state()
+        self.target = self.aimer.choose(ids, x, y, vx, game.dt)
+        if self.target is None:
+            return game.aim_x, game.aim_y, False
+        _, angle, _ = self.target
+        aim_x = game.turret_x + 100 * math.cos(angle)
+        aim_y = game.turret_y + 100 * math.sin(angle)
+        fire = self.auto_fire and self.cooldown <= 0
+        if fire:
+            self.cooldown = self.fire_interval
+        return aim_x, aim_y, fire
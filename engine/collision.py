@@ -0,0 +1,229 @@
+"""Bullet-versus-fighter collision detection on a uniform grid.
+
+Broad phase: bullets are bucketed into square cells by sorting their cell
+keys, and each fighter box only looks up the handful of cells it overlaps.
+Narrow phase: every candidate (fighter, bullet) pair is tested in one
+vectorized pass, either point-in-box at the end of the frame
+(:func:`resolve_hits`) or segment-versus-box over the frame's motion
+(:func:`resolve_swept_hits`).
+
+Hits follow the game's scoring rule: fighters are visited in their given
+order and each takes the first (lowest order) bullet inside its box that no
+earlier fighter has taken, so one bullet kills at most one fighter and each
+kill scores once.
+"""
+import numpy as np
+
+# Fighter hitbox, matching pygame.Rect(e.x, e.y - 10, 20, 20) in game.py
+BOX_WIDTH = 20
+BOX_HEIGHT = 20
+BOX_TOP_OFFSET = -10
+
+# Below this many (fighter, bullet) combinations the grid costs more than it
+# saves, and every pair goes straight to the narrow phase
+BRUTE_FORCE_PAIRS = 2048
+
+# Keys pack (cell_x, cell_y) into one int64; cell_y is shifted to stay positive
+_KEY_SHIFT = 1 << 31
+
+
+def _cell_keys(cx, cy):
+    return cx * (2 * _KEY_SHIFT) + (cy + _KEY_SHIFT)
+
+
+def _expand_ranges(starts, stops):
+    # Concatenate arange(start, stop) for every pair; also return the owner
+    counts = stops - starts
+    owner = np.repeat(np.arange(starts.size), counts)
+    offsets = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, starts[owner] + offsets
+
+
+def _covered_cells(x0, y0, x1, y1, cell_size):
+    # (owner, cell_x, cell_y) for every grid cell each box overlaps, and
+    # whether every box sits in a single cell
+    cx0 = np.floor_divide(x0, cell_size).astype(np.int64)
+    cy0 = np.floor_divide(y0, cell_size).astype(np.int64)
+    cx1 = np.floor_divide(x1, cell_size).astype(np.int64)
+    cy1 = np.floor_divide(y1, cell_size).astype(np.int64)
+    ny = cy1 - cy0 + 1
+    counts = (cx1 - cx0 + 1) * ny
+    if counts.size and counts.max() == 1:
+        # Points and boxes inside a single cell
+        return np.arange(counts.size), cx0, cy0, True
+    owner, k = _expand_ranges(np.zeros_like(counts), counts)
+    return owner, cx0[owner] + k // ny[owner], cy0[owner] + k % ny[owner], False
+
+
+def _all_pairs(na, nb):
+    return np.repeat(np.arange(na), nb), np.tile(np.arange(nb), na)
+
+
+def candidate_pairs(a_bounds, b_bounds, cell_size):
+    """Broad phase: index pairs of boxes from two sets sharing a grid cell.
+
+    Each bounds argument is an ``(x0, y0, x1, y1)`` tuple of arrays with
+    inclusive extents; points are boxes with ``x0 == x1`` and ``y0 == y1``.
+    Every pair of overlapping boxes is reported exactly once.
+    """
+    b_owner, b_cx, b_cy, b_single = _covered_cells(*b_bounds, cell_size)
+    keys = _cell_keys(b_cx, b_cy)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    a_owner, a_cx, a_cy, a_single = _covered_cells(*a_bounds, cell_size)
+    cells = _cell_keys(a_cx, a_cy)
+    starts = np.searchsorted(sorted_keys, cells, side='left')
+    stops = np.searchsorted(sorted_keys, cells, side='right')
+    owner, slots = _expand_ranges(starts, stops)
+    a = a_owner[owner]
+    b = b_owner[order[slots]]
+    if a_single or b_single:
+        return a, b
+
+    # Boxes spanning several cells meet in more than one; keep only the
+    # cell holding the low corner of their overlap
+    corner_x = np.maximum(a_bounds[0][a], b_bounds[0][b])
+    corner_y = np.maximum(a_bounds[1][a], b_bounds[1][b])
+    keep = ((a_cx[owner] == np.floor_divide(corner_x, cell_size)) &
+            (a_cy[owner] == np.floor_divide(corner_y, cell_size)))
+    return a[keep], b[keep]
+
+
+def resolve_hits(enemy_x, enemy_y, enemy_order, bullet_x, bullet_y, bullet_order,
+                 cell_size=BOX_WIDTH):
+    """Return ``(enemy_index, bullet_index)`` arrays of this frame's kills.
+
+    Positions are floats; like pygame.Rect, box corners and bullet points
+    are truncated to integers. ``*_order`` give the visiting order (e.g.
+    spawn ids); lower goes first.
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if len(enemy_x) == 0 or len(bullet_x) == 0:
+        return empty, empty
+
+    left = np.trunc(enemy_x)
+    top = np.trunc(np.asarray(enemy_y) + BOX_TOP_OFFSET)
+    px = np.trunc(bullet_x)
+    py = np.trunc(bullet_y)
+
+    if left.size * px.size <= BRUTE_FORCE_PAIRS:
+        e, b = _all_pairs(left.size, px.size)
+    else:
+        # Integer boxes [left, left + width) hold the same integer points as
+        # the inclusive box [left, left + width - 1]
+        e, b = candidate_pairs(
+            (left, top, left + BOX_WIDTH - 1, top + BOX_HEIGHT - 1),
+            (px, py, px, py), cell_size)
+
+    # Narrow phase over all candidate pairs at once
+    inside = ((px[b] >= left[e]) & (px[b] < left[e] + BOX_WIDTH) &
+              (py[b] >= top[e]) & (py[b] < top[e] + BOX_HEIGHT))
+    e, b = e[inside], b[inside]
+    if e.size == 0:
+        return empty, empty
+
+    return assign_hits(e, b, np.asarray(enemy_order)[e], np.asarray(bullet_order)[b])
+
+
+def assign_hits(e, b, e_order, b_order):
+    """Greedy one-to-one matching of hit pairs in (enemy, bullet) order."""
+    rank = np.lexsort((b_order, e_order))
+    e, b = e[rank], b[rank]
+
+    # Usually every fighter's first choice is a distinct bullet, in which
+    # case those first choices are the answer
+    first = np.ones(e.size, dtype=bool)
+    first[1:] = e[1:] != e[:-1]
+    if np.unique(b[first]).size == np.count_nonzero(first):
+        return e[first], b[first]
+
+    # Otherwise walk the pairs; only contested bullets get here
+    killed = set()
+    used = set()
+    hits_e = []
+    hits_b = []
+    for ei, bi in zip(e.tolist(), b.tolist()):
+        if ei in killed or bi in used:
+            continue
+        killed.add(ei)
+        used.add(bi)
+        hits_e.append(ei)
+        hits_b.append(bi)
+    return np.array(hits_e, dtype=np.intp), np.array(hits_b, dtype=np.intp)
+
+
+def segment_hits_box(sx, sy, dx, dy, x0, y0, x1, y1):
+    """Slab test: does the segment (sx, sy) + s * (dx, dy), s in [0, 1],
+    touch the closed box [x0, x1] x [y0, y1]?"""
+    s_in = np.zeros(np.shape(sx))
+    s_out = np.ones(np.shape(sx))
+    miss = np.zeros(np.shape(sx), dtype=bool)
+    for start, delta, lo, hi in ((sx, dx, x0, x1), (sy, dy, y0, y1)):
+        parallel = delta == 0
+        miss |= parallel & ((start < lo) | (start > hi))
+        step = np.where(parallel, 1.0, delta)
+        ta = (lo - start) / step
+        tb = (hi - start) / step
+        s_in = np.where(parallel, s_in, np.maximum(s_in, np.minimum(ta, tb)))
+        s_out = np.where(parallel, s_out, np.minimum(s_out, np.maximum(ta, tb)))
+    return ~miss & (s_in <= s_out)
+
+
+def resolve_swept_hits(enemy_x0, enemy_x1, enemy_y, enemy_order,
+                       bullet_x0, bullet_y0, bullet_x1, bullet_y1, bullet_order,
+                       cell_size=BOX_WIDTH):
+    """Continuous counterpart of :func:`resolve_hits`.
+
+    Bullets move along the segment from ``(x0, y0)`` to ``(x1, y1)`` during
+    the frame while fighters move horizontally from ``enemy_x0`` to
+    ``enemy_x1``. A bullet hits a fighter if at any time in the frame it
+    touches the fighter's box, so fast bullets cannot tunnel through targets
+    at large time steps. Every hit the end-of-frame point test would find is
+    also found here.
+    """
+    empty = np.zeros(0, dtype=np.intp)
+    if len(enemy_x1) == 0 or len(bullet_x1) == 0:
+        return empty, empty
+
+    enemy_x0 = np.asarray(enemy_x0)
+    enemy_x1 = np.asarray(enemy_x1)
+    bullet_x0 = np.asarray(bullet_x0)
+    bullet_y0 = np.asarray(bullet_y0)
+    bullet_x1 = np.asarray(bullet_x1)
+    bullet_y1 = np.asarray(bullet_y1)
+
+    # End-of-frame boxes, truncated like pygame.Rect
+    left = np.trunc(enemy_x1)
+    top = np.trunc(np.asarray(enemy_y) + BOX_TOP_OFFSET)
+    shift = enemy_x1 - enemy_x0
+
+    # Area each fighter and bullet sweeps this frame
+    e_bounds = (left + np.minimum(0.0, -shift), top,
+                left + BOX_WIDTH + np.maximum(0.0, -shift), top + BOX_HEIGHT)
+    b_bounds = (np.minimum(bullet_x0, bullet_x1), np.minimum(bullet_y0, bullet_y1),
+                np.maximum(bullet_x0, bullet_x1), np.maximum(bullet_y0, bullet_y1))
+    if left.size * bullet_x1.size <= BRUTE_FORCE_PAIRS:
+        e, b = _all_pairs(left.size, bullet_x1.size)
+    else:
+        e, b = candidate_pairs(e_bounds, b_bounds, cell_size)
+
+    # Cheap rejection of pairs whose swept areas do not overlap
+    overlap = ((e_bounds[0][e] <= b_bounds[2][b]) & (b_bounds[0][b] <= e_bounds[2][e]) &
+               (e_bounds[1][e] <= b_bounds[3][b]) & (b_bounds[1][b] <= e_bounds[3][e]))
+    e, b = e[overlap], b[overlap]
+    if e.size == 0:
+        return empty, empty
+
+    # Narrow phase in each fighter's frame of reference, where its box stays
+    # at the end-of-frame position and the bullet start is offset by the
+    # fighter's own motion
+    sx = bullet_x0[b] + shift[e]
+    sy = bullet_y0[b]
+    hit = segment_hits_box(sx, sy, bullet_x1[b] - sx, bullet_y1[b] - sy,
+                           left[e], top[e], left[e] + BOX_WIDTH, top[e] + BOX_HEIGHT)
+    e, b = e[hit], b[hit]
+    if e.size == 0:
+        return empty, empty
+
+    return assign_hits(e, b, np.asarray(enemy_order)[e], np.asarray(bullet_order)[b])
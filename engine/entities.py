@@ -0,0 +1,138 @@
+"""Struct-of-arrays entity stores for the game simulation.
+
+``BulletStore`` and ``EnemyStore`` keep positions, velocities and an active
+mask in preallocated NumPy arrays and update every entity in one vectorized
+pass. They reproduce the per-object ``Bullet.update`` / ``Enemy.update``
+arithmetic in game.py operation for operation, so a game run on either
+representation evolves identically.
+
+Dead entries are dropped with swap-remove compaction, which moves survivors
+from the tail into the holes instead of shifting the whole array. Storage
+order is therefore not creation order; each entity carries a monotonically
+increasing ``ids`` entry for code that needs the original ordering.
+"""
+import math
+
+import numpy as np
+
+
+class EntityStore:
+    """Base store: growable columns plus active mask and creation ids."""
+
+    columns = ()
+
+    def __init__(self, capacity=256):
+        self.n = 0
+        self._next_id = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        old_n = self.n
+        for name in self.columns:
+            new = np.zeros(capacity)
+            if hasattr(self, name):
+                new[:old_n] = getattr(self, name)[:old_n]
+            setattr(self, name, new)
+        active = np.zeros(capacity, dtype=bool)
+        ids = np.zeros(capacity, dtype=np.int64)
+        if hasattr(self, 'active'):
+            active[:old_n] = self.active[:old_n]
+            ids[:old_n] = self.ids[:old_n]
+        self.active = active
+        self.ids = ids
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.n
+
+    def _append(self, **values):
+        if self.n == self.capacity:
+            self._alloc(2 * self.capacity)
+        i = self.n
+        for name, value in values.items():
+            getattr(self, name)[i] = value
+        self.active[i] = True
+        self.ids[i] = self._next_id
+        self._next_id += 1
+        self.n += 1
+        return i
+
+    def clear(self):
+        self.n = 0
+
+    def compact(self):
+        """Swap-remove every inactive entry, keeping the arrays dense."""
+        n = self.n
+        alive = self.active[:n]
+        m = int(np.count_nonzero(alive))
+        if m == n:
+            return
+        # Holes in the kept prefix are filled by survivors from the tail
+        holes = np.flatnonzero(~alive[:m])
+        movers = m + np.flatnonzero(alive[m:])
+        for name in self.columns + ('active', 'ids'):
+            column = getattr(self, name)
+            column[holes] = column[movers]
+        self.n = m
+
+
+class BulletStore(EntityStore):
+    """Bullets slowed by quadratic drag and culled at the screen bounds."""
+
+    # px/py hold the position at the start of the last update
+    columns = ('x', 'y', 'vx', 'vy', 'px', 'py')
+
+    def __init__(self, width, height, rho, cd, area, mass, capacity=256):
+        super().__init__(capacity)
+        self.width = width
+        self.height = height
+        self.rho = rho
+        self.cd = cd
+        self.area = area
+        self.mass = mass
+
+    def add(self, x, y, angle, speed):
+        return self._append(x=x, y=y, px=x, py=y,
+                            vx=speed * math.cos(angle), vy=speed * math.sin(angle))
+
+    def update(self, dt):
+        n = self.n
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        self.px[:n] = x
+        self.py[:n] = y
+
+        # Same arithmetic as Bullet.update, one pass over all bullets
+        v = np.sqrt(vx**2 + vy**2)
+        drag_force = 0.5 * self.rho * (v**2) * self.cd * self.area
+        decel = drag_force / self.mass
+        moving = v > 0
+        safe_v = np.where(moving, v, 1.0)
+        vx -= np.where(moving, (vx / safe_v) * decel * dt, 0.0)
+        vy -= np.where(moving, (vy / safe_v) * decel * dt, 0.0)
+
+        x += vx * dt
+        y += vy * dt
+
+        gone = ((x < 0) | (x > self.width) | (y < 0) | (y > self.height) | (v < 10))
+        self.active[:n] &= ~gone
+
+
+class EnemyStore(EntityStore):
+    """Fighters flying left at constant speed."""
+
+    # px holds the position at the start of the last update
+    columns = ('x', 'y', 'vx', 'px')
+
+    def add(self, x, y, vx):
+        return self._append(x=x, y=y, vx=vx, px=x)
+
+    def update(self, dt):
+        """Advance all fighters. Returns True if any reached the base."""
+        n = self.n
+        self.px[:n] = self.x[:n]
+        self.x[:n] += self.vx[:n] * dt
+        # Like Enemy.update, this also applies to fighters shot down in the
+        # previous frame that have not been compacted yet
+        hit_base = self.x[:n] < 0
+        self.active[:n] &= ~hit_base
+        return bool(hit_base.any())
@@ -0,0 +1,183 @@
+"""Formation defense: many autonomous turrets sharing out many fighters.
+
+Every turret of a :class:`Formation` engages one fighter at a time, and no
+two turrets engage the same one. :class:`TargetAssigner` keeps that
+one-to-one matching up to date incrementally instead of rebuilding it every
+frame:
+
+* a turret keeps its fighter while that intercept stays feasible, and only
+  that one (turret, fighter) pair is re-solved, warm-started from the last
+  frame's answer;
+* turrets whose fighter died or became unreachable are matched against the
+  fighters nobody engages, on a cost matrix of drag-corrected intercept
+  times solved in one batch.
+
+So a frame costs one solve per turret plus one row per freed turret, rather
+than the full turrets x fighters matrix (20 x 500 pairs take about as long
+as a whole 60 FPS frame). Freed turrets are matched greedily, earliest
+intercept first, or optimally for the sum of their intercept times with
+SciPy's Hungarian-method ``linear_sum_assignment``.
+"""
+import numpy as np
+
+ASSIGNMENTS = ('greedy', 'hungarian')
+
+# Stand-in for infeasible pairs in the Hungarian cost matrix, which must be
+# finite; any intercept is far shorter
+_NO_INTERCEPT = 1e9
+
+
+def formation_positions(count, height, x=50.0, spacing=40.0, per_column=12):
+    """``(x, y)`` arrays of ``count`` turrets in columns along the base.
+
+    Columns hold up to ``per_column`` turrets evenly spread over the screen
+    height and stack rightwards ``spacing`` pixels apart.
+    """
+    rows = min(count, per_column)
+    i = np.arange(count)
+    column, row = np.divmod(i, rows)
+    # Every other column is offset by half a row so the barrels do not line up
+    y = (row + 0.5 + 0.5 * (column % 2)) * height / (rows + 0.5)
+    return x + spacing * column.astype(float), y
+
+
+def greedy_assignment(cost):
+    """``(rows, cols)`` of a one-to-one matching, cheapest finite pair first."""
+    cost = np.array(cost, dtype=float)
+    rows = []
+    cols = []
+    for _ in range(min(cost.shape)):
+        r, c = divmod(int(np.argmin(cost)), cost.shape[1])
+        if not np.isfinite(cost[r, c]):
+            break
+        rows.append(r)
+        cols.append(c)
+        cost[r, :] = np.inf
+        cost[:, c] = np.inf
+    return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)
+
+
+def hungarian_assignment(cost):
+    """``(rows, cols)`` minimising the summed cost of the finite pairs."""
+    # Imported here so that the game only loads SciPy when asked to
+    from scipy.optimize import linear_sum_assignment
+    cost = np.asarray(cost, dtype=float)
+    rows, cols = linear_sum_assignment(np.where(np.isfinite(cost), cost, _NO_INTERCEPT))
+    keep = np.isfinite(cost[rows, cols])
+    return rows[keep], cols[keep]
+
+
+class TargetAssigner:
+    """Incremental one-to-one assignment of fighters to turrets.
+
+    ``aimer`` is an :class:`engine.autoaim.InterceptAimer`; its bullet
+    physics and screen bounds are used for every turret in
+    ``turret_x``/``turret_y``.
+    """
+
+    def __init__(self, aimer, turret_x, turret_y, method='greedy'):
+        if method not in ASSIGNMENTS:
+            raise ValueError(f"unknown assignment {method!r}, expected one of {ASSIGNMENTS}")
+        self.aimer = aimer
+        self.turret_x = np.asarray(turret_x, dtype=float)
+        self.turret_y = np.asarray(turret_y, dtype=float)
+        self.match = greedy_assignment if method == 'greedy' else hungarian_assignment
+        self.clear()
+
+    def clear(self):
+        n = self.turret_x.size
+        # Engaged fighter id per turret (-1 for none) and that intercept
+        self.target = np.full(n, -1, dtype=np.int64)
+        self.t = np.full(n, np.nan)
+        self.angle = np.full(n, np.nan)
+        # Turrets re-matched in the last call, for profiling and tests
+        self.rematched = 0
+
+    def assign(self, ids, x, y, vx, dt=0.0):
+        """Update the matching for the fighters in play.
+
+        Returns the index into the given fighters that each turret engages
+        (-1 for none); the screen angles and intercept times are in
+        :attr:`angle` and :attr:`t`.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        vx = np.asarray(vx, dtype=float)
+        index = np.full(self.target.size, -1, dtype=np.intp)
+
+        # Find last frame's targets among the fighters still in play
+        order = np.argsort(ids)
+        if ids.size:
+            slot = np.clip(np.searchsorted(ids[order], self.target), 0, ids.size - 1)
+            found = ids[order[slot]] == self.target
+            index[found] = order[slot[found]]
+
+        # Re-solve the kept pairs only, warm-started from last frame
+        kept = np.flatnonzero(index >= 0)
+        if kept.size:
+            j = index[kept]
+            t, angle, _, feasible = self.aimer.intercept(
+                x[j], y[j], vx[j], self.t[kept] - dt, self.angle[kept],
+                self.turret_x[kept], self.turret_y[kept])
+            self.t[kept] = t
+            self.angle[kept] = angle
+            index[kept[~feasible]] = -1
+
+        # Match the idle turrets against the fighters nobody engages
+        idle = np.flatnonzero(index < 0)
+        free = np.ones(ids.size, dtype=bool)
+        free[index[index >= 0]] = False
+        free = np.flatnonzero(free)
+        self.rematched = idle.size if free.size else 0
+        if idle.size and free.size:
+            t, angle, _, feasible = self.aimer.intercept(
+                x[free], y[free], vx[free],
+                turret_x=self.turret_x[idle, None], turret_y=self.turret_y[idle, None])
+            rows, cols = self.match(np.where(feasible, t, np.inf))
+            index[idle[rows]] = free[cols]
+            self.t[idle[rows]] = t[rows, cols]
+            self.angle[idle[rows]] = angle[rows, cols]
+
+        engaged = index >= 0
+        self.target = np.where(engaged, ids[index] if ids.size else -1, -1)
+        self.t[~engaged] = np.nan
+        return index
+
+
+class Formation:
+    """Autonomous turrets that aim with a :class:`TargetAssigner` and fire
+    every ``fire_interval`` seconds at their feasible targets."""
+
+    def __init__(self, aimer, turret_x, turret_y, method='greedy', fire_interval=0.1):
+        self.assigner = TargetAssigner(aimer, turret_x, turret_y, method)
+        self.x = self.assigner.turret_x
+        self.y = self.assigner.turret_y
+        self.fire_interval = fire_interval
+        self.clear()
+
+    def __len__(self):
+        return self.x.size
+
+    def clear(self):
+        self.assigner.clear()
+        self.angle = np.zeros(self.x.size)
+        self.cooldown = np.zeros(self.x.size)
+
+    def step(self, game):
+        """Aim every turret at its target and fire those that are ready."""
+        dt = game.dt
+        self.cooldown -= dt
+        ids, x, y, vx = game.enemy_state()
+        engaged = self.assigner.assign(ids, x, y, vx, dt) >= 0
+        self.angle[engaged] = self.assigner.angle[engaged]
+        ready = np.flatnonzero(engaged & (self.cooldown <= 0))
+        self.cooldown[ready] = self.fire_interval
+        for i in ready.tolist():
+            game.shoot_from(float(self.x[i]), float(self.y[i]), float(self.angle[i]))
+
+    def barrels(self, length):
+        """``(x0, y0, x1, y1)`` lists of every turret's barrel, for drawing."""
+        x1 = self.x + length * np.cos(self.angle)
+        y1 = self.y + length * np.sin(self.angle)
+        return self.x.tolist(), self.y.tolist(), x1.tolist(), y1.tolist()
@@ -0,0 +1,94 @@
+"""Input sources that drive the turret once per frame.
+
+An input source has a single method, ``poll(game)``, returning
+``(aim_x, aim_y, fire)``: the screen point the turret should face and
+whether to fire this frame. The interactive game uses :class:`MouseInput`;
+headless runs plug in scripted or programmatic sources instead.
+"""
+import random
+
+import pygame
+
+
+class MouseInput:
+    """Aim at the mouse. Clicks arrive as pygame events, not through poll."""
+
+    def poll(self, game):
+        mx, my = pygame.mouse.get_pos()
+        return mx, my, False
+
+
+class ScriptedInput:
+    """Replay a fixed sequence of ``(aim_x, aim_y, fire)`` frames.
+
+    After the script runs out the last aim point is held without firing.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.index = 0
+
+    def poll(self, game):
+        if self.index < len(self.frames):
+            aim_x, aim_y, fire = self.frames[self.index]
+            self.index += 1
+            return aim_x, aim_y, bool(fire)
+        if self.frames:
+            aim_x, aim_y, _ = self.frames[-1]
+            return aim_x, aim_y, False
+        return game.turret_x + 1, game.turret_y, False
+
+
+class PolicyInput:
+    """Call ``policy(game)`` every frame for ``(aim_x, aim_y, fire)``."""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def poll(self, game):
+        aim_x, aim_y, fire = self.policy(game)
+        return aim_x, aim_y, bool(fire)
+
+
+class TrackingInput:
+    """Simple bot: aim at the fighter closest to the base, with a fixed lead.
+
+    Fires every ``fire_interval`` seconds of simulated time. ``lead_time``
+    shifts the aim point along the fighter's velocity.
+    """
+
+    def __init__(self, fire_interval=0.1, lead_time=0.0):
+        self.fire_interval = fire_interval
+        self.lead_time = lead_time
+        self.cooldown = 0.0
+
+    def poll(self, game):
+        self.cooldown -= game.dt
+        _, x, y, vx = game.enemy_state()
+        if len(x) == 0:
+            return game.turret_x + 1, game.turret_y, False
+        i = int(x.argmin())
+        aim_x = x[i] + vx[i] * self.lead_time
+        aim_y = y[i]
+        fire = self.cooldown <= 0
+        if fire:
+            self.cooldown = self.fire_interval
+        return aim_x, aim_y, fire
+
+
+class RandomInput:
+    """Baseline bot: fire at random screen points on a fixed interval."""
+
+    def __init__(self, fire_interval=0.1, seed=None, width=800, height=600):
+        self.fire_interval = fire_interval
+        self.rng = random.Random(seed)
+        self.width = width
+        self.height = height
+        self.cooldown = 0.0
+
+    def poll(self, game):
+        self.cooldown -= game.dt
+        fire = self.cooldown <= 0
+        if fire:
+            self.cooldown = self.fire_interval
+        return self.rng.uniform(0, self.width), self.rng.uniform(0, self.height), fire
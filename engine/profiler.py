@@ -0,0 +1,201 @@
+"""Per-phase frame timing for the game loop.
+
+The game calls :meth:`FrameProfiler.begin_frame` once per frame and
+:meth:`FrameProfiler.lap` after each phase; every lap charges the time since
+the previous one to the named phase. Timings of the last ``capacity`` frames
+live in preallocated ring buffers, from which the summary, the frame-time
+histogram and the on-screen overlay are computed on demand. A disabled
+profiler returns from every call after a single attribute check.
+
+:meth:`FrameProfiler.export` writes the buffered frames in the Chrome trace
+event format, which chrome://tracing and https://ui.perfetto.dev open
+directly; it is plain JSON for any other offline analysis.
+"""
+import json
+import time
+
+import numpy as np
+import pygame
+
+PHASES = ('events', 'input', 'assign', 'move', 'collision', 'draw', 'present')
+
+# Frame-time histogram bins of the overlay, in milliseconds
+HISTOGRAM_BINS = np.arange(0.0, 42.0, 2.0)
+
+
+class FrameProfiler:
+    """Ring-buffered phase timer; see the module docstring."""
+
+    def __init__(self, phases=PHASES, capacity=600, enabled=False):
+        self.phases = tuple(phases)
+        self._index = {name: i for i, name in enumerate(self.phases)}
+        self.capacity = capacity
+        self.enabled = enabled
+        self.overlay = False
+        # Overlay text is re-rendered every `refresh` frames, not every frame
+        self.refresh = 15
+        self._font = None
+        self._panel = None
+        self.clear()
+
+    def clear(self):
+        n, k = self.capacity, len(self.phases)
+        # All times in integer nanoseconds; phase starts are offsets from the
+        # start of their frame, and a frame lasts until the next one begins
+        self.frame_start = np.zeros(n, dtype=np.int64)
+        self.frame_time = np.zeros(n, dtype=np.int64)
+        self.phase_start = np.zeros((n, k), dtype=np.int64)
+        self.phase_time = np.zeros((n, k), dtype=np.int64)
+        self.bullets = np.zeros(n, dtype=np.int32)
+        self.enemies = np.zeros(n, dtype=np.int32)
+        self.count = 0
+        self._row = -1
+        self._last = 0
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        # Do not stretch the last recorded frame across the pause
+        self._row = -1
+
+    def toggle_overlay(self):
+        """Show or hide the overlay, profiling only while it is shown."""
+        self.overlay = not self.overlay
+        self.set_enabled(self.overlay)
+        self._panel = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._row >= 0:
+            self.frame_time[self._row] = now - self.frame_start[self._row]
+        row = self.count % self.capacity
+        self.count += 1
+        self.frame_start[row] = now
+        self.frame_time[row] = 0
+        self.phase_start[row] = 0
+        self.phase_time[row] = 0
+        self._row = row
+        self._last = now
+
+    def lap(self, phase):
+        """Charge the time since the previous lap (or frame start) to ``phase``."""
+        if not self.enabled or self._row < 0:
+            return
+        now = time.perf_counter_ns()
+        row, i = self._row, self._index[phase]
+        if self.phase_time[row, i] == 0:
+            self.phase_start[row, i] = self._last - self.frame_start[row]
+        self.phase_time[row, i] += now - self._last
+        self._last = now
+
+    def end_frame(self, bullets, enemies):
+        """Record the frame's live entity counts."""
+        if not self.enabled or self._row < 0:
+            return
+        self.bullets[self._row] = bullets
+        self.enemies[self._row] = enemies
+
+    def completed(self):
+        # Ring rows of the finished frames, oldest first
+        n = min(self.count, self.capacity)
+        rows = (np.arange(self.count - n, self.count) % self.capacity)
+        return rows[self.frame_time[rows] > 0]
+
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """Counts of buffered frame times (ms) in ``bins``; the last bin is open."""
+        ms = self.frame_time[self.completed()] / 1e6
+        counts, _ = np.histogram(np.minimum(ms, bins[-1]), bins)
+        return counts, bins
+
+    def summary(self):
+        """Frame-time percentiles and per-phase mean / p95, in milliseconds."""
+        rows = self.completed()
+        if rows.size == 0:
+            return {'frames': 0}
+        frame_ms = self.frame_time[rows] / 1e6
+        phase_ms = self.phase_time[rows] / 1e6
+        return {
+            'frames': int(rows.size),
+            'fps': float(1e3 / frame_ms.mean()),
+            'frame_ms': {
+                'mean': float(frame_ms.mean()),
+                'p50': float(np.percentile(frame_ms, 50)),
+                'p95': float(np.percentile(frame_ms, 95)),
+                'p99': float(np.percentile(frame_ms, 99)),
+                'max': float(frame_ms.max()),
+            },
+            'phase_ms': {
+                name: {'mean': float(phase_ms[:, i].mean()),
+                       'p95': float(np.percentile(phase_ms[:, i], 95))}
+                for i, name in enumerate(self.phases)
+            },
+            'bullets': int(self.bullets[rows[-1]]),
+            'enemies': int(self.enemies[rows[-1]]),
+        }
+
+    def export(self, path):
+        """Write the buffered frames as a Chrome trace; returns the frame count."""
+        rows = self.completed()
+        origin = self.frame_start[rows[0]] if rows.size else 0
+        events = []
+        for row in rows.tolist():
+            ts = (self.frame_start[row] - origin) / 1e3
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': ts, 'dur': self.frame_time[row] / 1e3})
+            for i, name in enumerate(self.phases):
+                if self.phase_time[row, i]:
+                    events.append({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                                   'ts': ts + self.phase_start[row, i] / 1e3,
+                                   'dur': self.phase_time[row, i] / 1e3})
+            events.append({'name': 'entities', 'ph': 'C', 'pid': 0, 'ts': ts,
+                           'args': {'bullets': int(self.bullets[row]),
+                                    'enemies': int(self.enemies[row])}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return int(rows.size)
+
+    def draw(self, screen):
+        """Blit the overlay panel to the top-right corner of ``screen``.
+
+        Returns the rect drawn to.
+        """
+        if self._panel is None or self.count % self.refresh == 0:
+            self._panel = self._render_panel()
+        return screen.blit(self._panel, (screen.get_width() - self._panel.get_width() - 10, 10))
+
+    def _render_panel(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 20)
+        stats = self.summary()
+        if stats['frames']:
+            frame = stats['frame_ms']
+            lines = [f"{stats['fps']:5.1f} FPS  frame p50 {frame['p50']:.1f}  "
+                     f"p95 {frame['p95']:.1f}  max {frame['max']:.1f} ms",
+                     f"bullets {stats['bullets']}  fighters {stats['enemies']}"]
+            lines += [f"{name:<10} {t['mean']:6.2f} ms  p95 {t['p95']:6.2f}"
+                      for name, t in stats['phase_ms'].items()]
+        else:
+            lines = ['collecting frames...']
+
+        line_height = self._font.get_linesize()
+        bar_height = 40
+        width = 260
+        panel = pygame.Surface((width, 10 + line_height * len(lines) + bar_height + 10),
+                               pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, line in enumerate(lines):
+            panel.blit(self._font.render(line, True, (255, 255, 255)), (8, 5 + i * line_height))
+
+        # Frame-time histogram, one bar per bin, tallest bar at full height
+        counts, bins = self.histogram()
+        top = 10 + line_height * len(lines)
+        bar_width = (width - 16) // counts.size
+        peak = max(int(counts.max()), 1)
+        for i, c in enumerate(counts.tolist()):
+            h = round(bar_height * c / peak)
+            # Bins past one 60 FPS frame (16.7 ms) are drawn in red
+            color = (255, 80, 80) if bins[i] >= 16 else (80, 200, 80)
+            pygame.draw.rect(panel, color, (8 + i * bar_width, top + bar_height - h,
+                                            bar_width - 1, h))
+        return panel
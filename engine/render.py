@@ -0,0 +1,132 @@
+"""Cached drawing for the game window.
+
+Three things make a frame cheap to draw:
+
+* fonts and rendered text are cached, so a label is only rasterised again
+  when its text changes (e.g. the score);
+* bullets and fighters are pre-rendered once into small sprites and blitted
+  in a single ``Surface.blits`` call per kind;
+* every blit and draw call records the rectangle it touched. The next frame
+  erases just those rectangles back to the background and hands old and new
+  rectangles to ``pygame.display.update`` instead of flipping the whole
+  screen.
+
+Anything that repaints the whole screen (a scene change, a window expose)
+calls :meth:`Renderer.invalidate` and gets one full redraw and flip.
+"""
+import pygame
+
+# Cached text surfaces before the cache starts over
+TEXT_CACHE_SIZE = 256
+
+# Past this many rectangles per frame, filling and flipping the whole screen
+# is cheaper than erasing and updating them one by one
+DIRTY_RECT_LIMIT = 400
+
+
+class TextCache:
+    """Fonts by size and rendered text by (text, size, color)."""
+
+    def __init__(self, name=None):
+        self.name = name
+        self._fonts = {}
+        self._text = {}
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.SysFont(self.name, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        surface = self._text.get(key)
+        if surface is None:
+            if len(self._text) >= TEXT_CACHE_SIZE:
+                self._text.clear()
+            surface = self._text[key] = self.font(size).render(text, True, color)
+        return surface
+
+
+def circle_sprite(color, radius):
+    """Filled circle; blit at (x - radius, y - radius) to centre it on (x, y).
+
+    Sprites are converted to the display format, so the display mode must
+    already be set.
+    """
+    size = 2 * radius + 1
+    sprite = pygame.Surface((size, size)).convert()
+    sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    return sprite
+
+
+def polygon_sprite(color, points):
+    """Filled polygon with its points relative to the sprite's top-left corner."""
+    width = max(x for x, _ in points) + 1
+    height = max(y for _, y in points) + 1
+    sprite = pygame.Surface((width, height)).convert()
+    sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+    pygame.draw.polygon(sprite, color, points)
+    return sprite
+
+
+class Renderer:
+    """Dirty-rectangle drawing onto the display surface.
+
+    Each frame is ``begin(scene)``, any number of ``blit``/``blits``/``mark``
+    calls, then ``present()``. ``scene`` is any comparable value describing
+    what is on screen; when it changes the frame is redrawn in full.
+    """
+
+    def __init__(self, screen, background=(0, 0, 0)):
+        self.screen = screen
+        self.background = background
+        self.text = TextCache()
+        self._scene = None
+        self._full = True
+        self._previous = []
+        self._dirty = []
+
+    def invalidate(self):
+        self._full = True
+
+    def begin(self, scene=None):
+        if scene != self._scene:
+            self._scene = scene
+            self._full = True
+        if self._full or len(self._previous) > DIRTY_RECT_LIMIT:
+            self.screen.fill(self.background)
+        else:
+            # Erase last frame's drawing; everything else is background already
+            fill = self.screen.fill
+            for rect in self._previous:
+                fill(self.background, rect)
+        self._dirty = []
+
+    def mark(self, rect):
+        """Record a rect touched by a ``pygame.draw`` call."""
+        self._dirty.append(rect)
+
+    def blit(self, surface, pos):
+        self._dirty.append(self.screen.blit(surface, pos))
+
+    def blits(self, sprite, positions):
+        """Blit one sprite at every top-left position in ``positions``."""
+        rects = self.screen.blits([(sprite, pos) for pos in positions])
+        self._dirty.extend(rects)
+
+    def label(self, text, size, color, x, y, center=False):
+        """Blit cached text with its top-left (or top-centre) at (x, y)."""
+        surface = self.text.render(text, size, color)
+        if center:
+            x -= surface.get_width() // 2
+        self.blit(surface, (x, y))
+
+    def present(self):
+        if self._full or len(self._previous) + len(self._dirty) > DIRTY_RECT_LIMIT:
+            pygame.display.flip()
+            self._full = False
+        else:
+            pygame.display.update(self._previous + self._dirty)
+        self._previous = self._dirty
@@ -1,7 +1,21 @@
 import pygame
+import hashlib
 import math
 import random
 import sys
+import time
+
+import numpy as np
+
+from engine.autoaim import AutoAimInput, InterceptAimer
+from engine.collision import resolve_hits, resolve_swept_hits
+from engine.entities import BulletStore, EnemyStore
+from engine.formation import Formation, formation_positions
+from engine.inputs import MouseInput, TrackingInput
+from engine.profiler import FrameProfiler
+from engine.render import Renderer, circle_sprite, polygon_sprite
+from engine.replay import (RESET, SEED_LIMIT, SHOT, TICK, InputLog, InputRecorder,
+                           PlaybackInput)
 
 # Physics Constants (from original project)
 # Although solve_ivp is too slow for real-time game loop, we can use Euler integration with these constants
@@ -11,8 +25,12 @@ CD = 0.295
 A = 0.000071  # m^2
 RHO = 1.225  # kg/m^3
 
+# Drag constant k in dv/dt = -k v^2, used to aim
+K_DRAG = 0.5 * RHO * CD * A / M_BULLET
+
 # Game Constants
 WIDTH, HEIGHT = 800, 600
+BULLET_SPEED = 890  # m/s from original code
 FPS = 60
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -20,6 +38,9 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 
+# Where F4 and --profile write the frame trace
+TRACE_PATH = "frame_trace.json"
+
 class Bullet:
     def __init__(self, x, y, angle, speed):
         self.x = x
@@ -27,8 +48,14 @@ class Bullet:
         self.vx = speed * math.cos(angle)
         self.vy = speed * math.sin(angle)
         self.active = True
+        # Position at the start of the last update, for swept collisions
+        self.prev_x = x
+        self.prev_y = y
 
     def update(self, dt):
+        self.prev_x = self.x
+        self.prev_y = self.y
+
         # Calculate velocity magnitude
         v = math.sqrt(self.vx**2 + self.vy**2)
 
@@ -56,14 +83,16 @@ class Bullet:
         pygame.draw.circle(screen, RED, (int(self.x), int(self.y)), 3)
 
 class Enemy:
-    def __init__(self, speed_mult=1.0):
+    def __init__(self, speed_mult=1.0, rng=random):
         self.x = WIDTH
-        self.y = random.randint(50, HEIGHT - 50)
-        self.vx = -random.randint(100, 300) * speed_mult
+        self.y = rng.randint(50, HEIGHT - 50)
+        self.vx = -rng.randint(100, 300) * speed_mult
         self.radius = 15
         self.active = True
+        self.prev_x = self.x
 
     def update(self, dt):
+        self.prev_x = self.x
         self.x += self.vx * dt
         if self.x < 0:
             self.active = False
@@ -78,18 +107,66 @@ class Enemy:
             (self.x + 20, self.y + 10)
         ])
 
+class Difficulty:
+    # Difficulty ramp: fighters get faster and spawn more often as the score
+    # climbs. The defaults are the original game's curve.
+    def __init__(self, speed_base=1.0, speed_ramp=0.01,
+                 spawn_base=1.0, spawn_ramp=0.05, spawn_min=0.2):
+        self.speed_base = speed_base
+        self.speed_ramp = speed_ramp
+        self.spawn_base = spawn_base
+        self.spawn_ramp = spawn_ramp
+        self.spawn_min = spawn_min
+
+    def speed_mult(self, score):
+        return self.speed_base + score * self.speed_ramp
+
+    def spawn_interval(self, score):
+        return max(self.spawn_min, self.spawn_base - score * self.spawn_ramp)
+
 class Game:
-    def __init__(self, test_mode=False):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Bomber Defense")
-        self.clock = pygame.time.Clock()
+    def __init__(self, test_mode=False, use_arrays=False, swept=True,
+                 headless=False, dt=1.0 / FPS, input_source=None, difficulty=None,
+                 profile=False, seed=None, record=False, turrets=0, wave_size=1,
+                 assignment="greedy"):
+        # Headless games open no window and render nothing; they advance in
+        # fixed steps of dt as fast as the CPU allows
+        self.headless = headless
+        if not headless:
+            pygame.init()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Bomber Defense")
+            self.clock = pygame.time.Clock()
+            # Cached text and sprites, redrawn only where the screen changed
+            self.renderer = Renderer(self.screen, BLACK)
+            self.bullet_sprite = circle_sprite(RED, 3)
+            self.enemy_sprite = polygon_sprite(GREEN, [(0, 10), (20, 0), (20, 20)])
         self.running = True
         self.test_mode = test_mode
         self.frames = 0
-
-        self.bullets = []
-        self.enemies = []
+        self.dt = dt
+        self.sim_time = 0.0
+        self.shots = 0
+        # All game randomness comes from this seeded generator, so the seed
+        # and the input log reproduce a session exactly
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        # Per-phase frame timings; F3 toggles it along with its overlay
+        self.profiler = FrameProfiler(enabled=profile)
+        self.profiler.overlay = profile and not headless
+
+        # Where the turret aims and when it fires, polled once per frame
+        self.input = input_source if input_source is not None else MouseInput()
+        self.aim_x, self.aim_y = WIDTH, HEIGHT // 2
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+
+        # Optional struct-of-arrays entity storage, updated in vectorized passes
+        self.use_arrays = use_arrays
+        # Test bullets' whole path during the frame rather than only their end
+        # point, so hits survive large or variable time steps
+        self.swept = swept
+        self.bullets = self.new_bullets()
+        self.enemies = self.new_enemies()
         self.score = 0
         self.game_over = False
 
@@ -100,65 +177,224 @@ class Game:
 
         self.spawn_timer = 0
         self.spawn_rate = 1.0 # seconds
+        self.enemies_spawned = 0
+        # Fighters per spawn tick
+        self.wave_size = wave_size
+
+        # Optional autonomous turrets alongside the player's, each engaging
+        # its own fighter (see engine.formation)
+        self.formation = None
+        if turrets:
+            x, y = formation_positions(turrets, HEIGHT, x=self.turret_x + 40)
+            self.formation = Formation(self.intercept_aimer(), x, y, assignment)
+
+        # Ticks, clicks and restarts for an exact replay (see engine.replay)
+        self.recorder = (InputRecorder(self.seed, use_arrays, swept, turrets, wave_size,
+                                       assignment) if record else None)
+
+    def new_bullets(self):
+        if self.use_arrays:
+            return BulletStore(WIDTH, HEIGHT, RHO, CD, A, M_BULLET)
+        return []
+
+    def new_enemies(self):
+        if self.use_arrays:
+            return EnemyStore()
+        return []
 
     def reset(self):
-        self.bullets = []
-        self.enemies = []
+        self.bullets = self.new_bullets()
+        self.enemies = self.new_enemies()
         self.score = 0
         self.game_over = False
         self.turret_y = HEIGHT // 2
+        self.spawn_timer = 0
+        self.enemies_spawned = 0
+        self.frames = 0
+        self.sim_time = 0.0
+        self.shots = 0
+        if self.formation is not None:
+            self.formation.clear()
 
     def run(self):
+        if self.headless:
+            return self.run_episode(max_frames=60 if self.test_mode else None)
+
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0  # seconds
+            self.profiler.begin_frame()
             self.handle_events()
-
-            if not self.game_over:
-                self.update(dt)
-
+            self.profiler.lap('events')
+            self.step(dt)
             self.draw()
 
-            if self.test_mode:
-                self.frames += 1
-                if self.frames > 60:
-                    self.running = False
+            if self.test_mode and self.frames > 60:
+                self.running = False
 
         pygame.quit()
 
+    def step(self, dt):
+        # One frame of simulation: poll the input source, then advance
+        self.dt = dt
+        self.aim_x, self.aim_y, fire = self.input.poll(self)
+        if self.recorder is not None:
+            self.recorder.tick(dt, self.aim_x, self.aim_y, fire)
+        self.aim_turret()
+        if fire and not self.game_over:
+            self.shoot()
+        self.profiler.lap('input')
+        if self.formation is not None and not self.game_over:
+            self.formation.step(self)
+            self.profiler.lap('assign')
+        if not self.game_over:
+            self.update(dt)
+            self.sim_time += dt
+        self.frames += 1
+        if self.profiler.enabled:
+            self.profiler.end_frame(*self.entity_counts())
+
+    def run_episode(self, max_frames=None, max_time=None):
+        """Play one headless game in fixed steps until game over or a limit.
+
+        Returns a dict of per-episode stats.
+        """
+        self.reset()
+        start = time.perf_counter()
+        while not self.game_over:
+            if max_frames is not None and self.frames >= max_frames:
+                break
+            if max_time is not None and self.sim_time >= max_time:
+                break
+            self.profiler.begin_frame()
+            self.step(self.dt)
+        wall_time = time.perf_counter() - start
+        return {
+            'score': self.score,
+            'frames': self.frames,
+            'sim_time': self.sim_time,
+            'game_over': self.game_over,
+            'shots': self.shots,
+            'wall_time': wall_time,
+            'fps': self.frames / wall_time if wall_time > 0 else float('inf'),
+        }
+
+    def enemy_state(self):
+        # (ids, x, y, vx) arrays of the fighters still in play, for either
+        # storage; ids count spawns since the last reset
+        if self.use_arrays:
+            n = self.enemies.n
+            live = self.enemies.active[:n]
+            return (self.enemies.ids[:n][live], self.enemies.x[:n][live],
+                    self.enemies.y[:n][live], self.enemies.vx[:n][live])
+        live = [e for e in self.enemies if e.active]
+        return (np.array([e.id for e in live], dtype=np.int64), np.array([e.x for e in live]),
+                np.array([e.y for e in live]), np.array([e.vx for e in live]))
+
+    def entity_counts(self):
+        # (bullets, fighters) currently in play
+        if self.use_arrays:
+            return (int(np.count_nonzero(self.bullets.active[:self.bullets.n])),
+                    int(np.count_nonzero(self.enemies.active[:self.enemies.n])))
+        return len(self.bullets), len(self.enemies)
+
+    def intercept_aimer(self):
+        # Lead-angle solver using the same drag physics as the bullets
+        return InterceptAimer(self.turret_x, self.turret_y, BULLET_SPEED, K_DRAG,
+                              (WIDTH, HEIGHT))
+
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN and not self.game_over:
                 if event.button == 1: # Left click
                     self.shoot()
+                    self.record_event(SHOT)
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r and self.game_over:
                     self.reset()
+                    self.record_event(RESET)
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                elif event.key == pygame.K_F4:
+                    print(f"{self.profiler.export(TRACE_PATH)} frames -> {TRACE_PATH}")
+                elif event.key == pygame.K_a:
+                    # Toggle auto-aim; the player still fires
+                    if isinstance(self.input, AutoAimInput):
+                        self.input = MouseInput()
+                    else:
+                        self.input = AutoAimInput(auto_fire=False)
+
+    def record_event(self, code):
+        if self.recorder is not None:
+            self.recorder.event(code)
+
+    def checksum(self):
+        # Digest of the game state; bullets and fighters are sorted by
+        # position and hashed as float64 columns of the live entities only
+        # (bullets that hit this frame linger in the object list until the
+        # next update), so both entity storages give the same value
+        ids, ex, ey, evx = self.enemy_state()
+        if self.use_arrays:
+            live = self.bullets.active[:self.bullets.n]
+            bx, by = self.bullets.x[:self.bullets.n][live], self.bullets.y[:self.bullets.n][live]
+        else:
+            bx = np.array([b.x for b in self.bullets if b.active], dtype=float)
+            by = np.array([b.y for b in self.bullets if b.active], dtype=float)
+        ex, ey, evx, bx, by = (np.asarray(a, dtype=float) for a in (ex, ey, evx, bx, by))
+        e = np.lexsort((ey, ex))
+        b = np.lexsort((by, bx))
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((self.score, self.frames, self.shots, self.game_over,
+                       self.enemies_spawned, self.sim_time, self.turret_angle)).encode())
+        for column in (ids[e], ex[e], ey[e], evx[e], bx[b], by[b]):
+            h.update(np.ascontiguousarray(column).tobytes())
+        return h.digest()
+
+    def save_log(self, path):
+        self.recorder.save(path, self.checksum())
 
     def shoot(self):
+        self.shoot_from(self.turret_x, self.turret_y, self.turret_angle)
+
+    def shoot_from(self, x, y, angle):
         # Bullet initial speed
-        speed = 890 # m/s from original code
-        bullet = Bullet(self.turret_x, self.turret_y, self.turret_angle, speed)
+        speed = BULLET_SPEED
+        self.shots += 1
+        if self.use_arrays:
+            self.bullets.add(x, y, angle, speed)
+            return
+        bullet = Bullet(x, y, angle, speed)
         self.bullets.append(bullet)
 
+    def aim_turret(self):
+        dx = self.aim_x - self.turret_x
+        dy = self.aim_y - self.turret_y
+        self.turret_angle = math.atan2(dy, dx)
+
     def update(self, dt):
         # Update Turret Angle
-        mx, my = pygame.mouse.get_pos()
-        dx = mx - self.turret_x
-        dy = my - self.turret_y
-        self.turret_angle = math.atan2(dy, dx)
+        self.aim_turret()
 
         # Spawn Enemies
         self.spawn_timer -= dt
         if self.spawn_timer <= 0:
-            self.enemies.append(Enemy(speed_mult=1.0 + self.score * 0.01))
-            self.spawn_timer = max(0.2, 1.0 - self.score * 0.05)
-
-        # Update Bullets
-        for b in self.bullets:
+            for _ in range(self.wave_size):
+                self.spawn_enemy(speed_mult=self.difficulty.speed_mult(self.score))
+            self.spawn_timer = self.difficulty.spawn_interval(self.score)
+
+        if self.use_arrays:
+            self.update_arrays(dt)
+            return
+
+        # Update Bullets; bullets leaving the screen this frame stay in
+        # `flying` so the swept test can still catch them on the way out
+        flying = [b for b in self.bullets if b.active]
+        for b in flying:
             b.update(dt)
-        self.bullets = [b for b in self.bullets if b.active]
+        self.bullets = [b for b in flying if b.active]
 
         # Update Enemies
         for e in self.enemies:
@@ -166,58 +402,189 @@ class Game:
             if result == "hit_base":
                 self.game_over = True
         self.enemies = [e for e in self.enemies if e.active]
-
-        # Collision Detection
-        for e in self.enemies:
-            e_rect = pygame.Rect(e.x, e.y - 10, 20, 20)
-            for b in self.bullets:
-                if b.active:
-                    # Simple point collision
-                    if e_rect.collidepoint(b.x, b.y):
-                        e.active = False
-                        b.active = False
-                        self.score += 1
-                        break
+        self.profiler.lap('move')
+
+        # Collision Detection: grid broad phase, then one vectorized
+        # narrow phase; each fighter takes the oldest bullet inside its box
+        candidates = flying if self.swept else self.bullets
+        if self.enemies and candidates:
+            order_e = np.arange(len(self.enemies))
+            order_b = np.arange(len(candidates))
+            if self.swept:
+                hits_e, hits_b = resolve_swept_hits(
+                    np.array([e.prev_x for e in self.enemies]), np.array([e.x for e in self.enemies]),
+                    np.array([e.y for e in self.enemies]), order_e,
+                    np.array([b.prev_x for b in candidates]), np.array([b.prev_y for b in candidates]),
+                    np.array([b.x for b in candidates]), np.array([b.y for b in candidates]), order_b)
+            else:
+                hits_e, hits_b = resolve_hits(
+                    np.array([e.x for e in self.enemies]), np.array([e.y for e in self.enemies]), order_e,
+                    np.array([b.x for b in candidates]), np.array([b.y for b in candidates]), order_b)
+            for ei, bi in zip(hits_e, hits_b):
+                self.enemies[ei].active = False
+                candidates[bi].active = False
+            self.score += len(hits_e)
+        self.profiler.lap('collision')
+
+    def spawn_enemy(self, speed_mult):
+        enemy = Enemy(speed_mult=speed_mult, rng=self.rng)
+        enemy.id = self.enemies_spawned
+        self.enemies_spawned += 1
+        if self.use_arrays:
+            self.enemies.add(enemy.x, enemy.y, enemy.vx)
+        else:
+            self.enemies.append(enemy)
+
+    def update_arrays(self, dt):
+        # Vectorized counterpart of the per-object loops in update(). Bullets
+        # are compacted before moving so those culled this frame are still
+        # available to the swept test.
+        bullets, enemies = self.bullets, self.enemies
+        bullets.compact()
+        bullets.update(dt)
+
+        if enemies.update(dt):
+            self.game_over = True
+        enemies.compact()
+        self.profiler.lap('move')
+
+        # Collision Detection, same rule as the object path with spawn ids
+        # standing in for list order
+        ne = enemies.n
+        if self.swept:
+            b = slice(0, bullets.n)
+            hits_e, hits_b = resolve_swept_hits(
+                enemies.px[:ne], enemies.x[:ne], enemies.y[:ne], enemies.ids[:ne],
+                bullets.px[b], bullets.py[b], bullets.x[b], bullets.y[b], bullets.ids[b])
+        else:
+            b = np.flatnonzero(bullets.active[:bullets.n])
+            hits_e, hits_b = resolve_hits(
+                enemies.x[:ne], enemies.y[:ne], enemies.ids[:ne],
+                bullets.x[b], bullets.y[b], bullets.ids[b])
+            hits_b = b[hits_b]
+        enemies.active[hits_e] = False
+        bullets.active[hits_b] = False
+        self.score += len(hits_e)
+        self.profiler.lap('collision')
 
     def draw(self):
-        self.screen.fill(BLACK)
+        r = self.renderer
+        r.begin(scene=self.game_over)
 
         if self.game_over:
-            font = pygame.font.SysFont(None, 64)
-            text = font.render("GAME OVER", True, RED)
-            self.screen.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 - 50))
-
-            font_small = pygame.font.SysFont(None, 32)
-            score_text = font_small.render(f"Final Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2 + 20))
-
-            restart_text = font_small.render("Press 'R' to Restart", True, WHITE)
-            self.screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 + 60))
+            r.label("GAME OVER", 64, RED, WIDTH//2, HEIGHT//2 - 50, center=True)
+            r.label(f"Final Score: {self.score}", 32, WHITE, WIDTH//2, HEIGHT//2 + 20, center=True)
+            r.label("Press 'R' to Restart", 32, WHITE, WIDTH//2, HEIGHT//2 + 60, center=True)
 
         else:
             # Draw Turret
-            pygame.draw.circle(self.screen, BLUE, (self.turret_x, self.turret_y), 20)
+            r.mark(pygame.draw.circle(self.screen, BLUE, (self.turret_x, self.turret_y), 20))
             # Turret Barrel
             end_x = self.turret_x + 40 * math.cos(self.turret_angle)
             end_y = self.turret_y + 40 * math.sin(self.turret_angle)
-            pygame.draw.line(self.screen, BLUE, (self.turret_x, self.turret_y), (end_x, end_y), 5)
-
-            # Draw Bullets
-            for b in self.bullets:
-                b.draw(self.screen)
+            r.mark(pygame.draw.line(self.screen, BLUE, (self.turret_x, self.turret_y), (end_x, end_y), 5))
+            if self.formation is not None:
+                self.draw_formation()
 
-            # Draw Enemies
-            for e in self.enemies:
-                e.draw(self.screen)
+            if self.use_arrays:
+                self.draw_arrays()
+            else:
+                # Draw Bullets and Enemies from their sprites, one batch each
+                r.blits(self.bullet_sprite, [(int(b.x) - 3, int(b.y) - 3) for b in self.bullets])
+                r.blits(self.enemy_sprite, [(int(e.x), int(e.y) - 10) for e in self.enemies])
 
             # Draw Score
-            font = pygame.font.SysFont(None, 36)
-            score_text = font.render(f"Score: {self.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
+            r.label(f"Score: {self.score}", 36, WHITE, 10, 10)
+
+        if self.profiler.overlay:
+            r.mark(self.profiler.draw(self.screen))
+        self.profiler.lap('draw')
+        r.present()
+        self.profiler.lap('present')
+
+    def draw_formation(self):
+        r = self.renderer
+        for x0, y0, x1, y1 in zip(*self.formation.barrels(15)):
+            r.mark(pygame.draw.circle(self.screen, BLUE, (int(x0), int(y0)), 8))
+            r.mark(pygame.draw.line(self.screen, BLUE, (x0, y0), (x1, y1), 3))
+
+    def draw_arrays(self):
+        bullets, enemies = self.bullets, self.enemies
+        live = bullets.active[:bullets.n]
+        x = bullets.x[:bullets.n][live].astype(int) - 3
+        y = bullets.y[:bullets.n][live].astype(int) - 3
+        self.renderer.blits(self.bullet_sprite, zip(x.tolist(), y.tolist()))
+        live = enemies.active[:enemies.n]
+        x = enemies.x[:enemies.n][live].astype(int)
+        y = enemies.y[:enemies.n][live].astype(int) - 10
+        self.renderer.blits(self.enemy_sprite, zip(x.tolist(), y.tolist()))
+
+def replay(path):
+    """Re-simulate a recorded session headlessly and check its final state.
+
+    Returns ``(game, matches, wall_time)``.
+    """
+    log = InputLog(path)
+    playback = PlaybackInput()
+    game = Game(use_arrays=log.use_arrays, swept=log.swept, headless=True,
+                input_source=playback, seed=log.seed, turrets=log.turrets,
+                wave_size=log.wave_size, assignment=log.assignment)
+    start = time.perf_counter()
+    for code, values in log.records():
+        if code == TICK:
+            dt, aim_x, aim_y, fire = values
+            playback.current = (aim_x, aim_y, bool(fire))
+            game.step(dt)
+        elif code == SHOT:
+            game.shoot()
+        elif code == RESET:
+            game.reset()
+    wall_time = time.perf_counter() - start
+    return game, game.checksum() == log.checksum, wall_time
 
-        pygame.display.flip()
 
 if __name__ == "__main__":
+    def option(name):
+        return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else None
+
+    if "--replay" in sys.argv:
+        # Fast-forward a recorded session and verify where it ended up
+        try:
+            game, matches, wall_time = replay(option("--replay"))
+        except ValueError as exc:
+            sys.exit(str(exc))
+        print(f"{game.frames} ticks in {wall_time:.2f} s "
+              f"({game.frames / max(wall_time, 1e-9):.0f} ticks/s), score {game.score}")
+        print("checksum OK" if matches else "checksum MISMATCH")
+        sys.exit(0 if matches else 1)
+
     test_mode = "--test" in sys.argv
-    game = Game(test_mode=test_mode)
-    game.run()
+    use_arrays = "--arrays" in sys.argv
+    # Record per-phase frame timings from the start and save the trace on exit
+    profile = "--profile" in sys.argv
+    seed = int(option("--seed")) if "--seed" in sys.argv else None
+    if seed is not None and not 0 <= seed < SEED_LIMIT:
+        sys.exit(f"--seed must be in [0, 2**64), not {seed}")
+    # Write an input log of the session on exit, for --replay
+    record = option("--record")
+    # Formation mode: autonomous turrets and several fighters per spawn
+    formation = dict(turrets=int(option("--turrets") or 0), wave_size=int(option("--wave") or 1),
+                     assignment=option("--assign") or "greedy")
+    if "--headless" in sys.argv:
+        # Bot-driven games without a window, e.g. for balancing runs
+        bot = AutoAimInput() if "--auto" in sys.argv else TrackingInput()
+        game = Game(test_mode=test_mode, use_arrays=use_arrays, headless=True,
+                    input_source=bot, profile=profile, seed=seed, record=bool(record),
+                    **formation)
+        print(game.run())
+    else:
+        player = AutoAimInput(auto_fire=False) if "--auto" in sys.argv else None
+        game = Game(test_mode=test_mode, use_arrays=use_arrays, input_source=player,
+                    profile=profile, seed=seed, record=bool(record), **formation)
+        game.run()
+    if profile:
+        print(game.profiler.summary())
+        print(f"{game.profiler.export(TRACE_PATH)} frames -> {TRACE_PATH}")
+    if record:
+        game.save_log(record)
+        print(f"{game.recorder.ticks} ticks -> {record} (seed {game.seed})")
@@ -0,0 +1,131 @@
+"""Load test for the Dash app: many concurrent sessions dragging sliders.
+
+Each simulated session gets its own session id and repeatedly "drags" a
+random slider: it fires a burst of callback requests for consecutive slider
+values without waiting, then pauses. Requests the server superseded with a
+newer one from the same session come back empty (HTTP 204) and are counted
+separately; latency percentiles are over the answers users actually see.
+
+Start the server first, e.g.
+
+    gunicorn bomber_aim_5:server --workers 4 --threads 16 --bind 127.0.0.1:8050
+    python loadtest.py --sessions 50 --steps 20
+"""
+import argparse
+import concurrent.futures
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+
+# (slider id, min, max, step), as in bomber_aim_5.serve_layout
+SLIDERS = [
+    ('d', 100, 2000, 100),
+    ('initial_fighter_y', 100, 2000, 50),
+    ('v_bullet', 500, 1000, 10),
+    ('v_bomber', 50, 300, 10),
+    ('v_fighter', 50, 500, 10),
+]
+DEFAULTS = {'d': 500, 'initial_fighter_y': 500, 'v_bullet': 890, 'v_bomber': 100,
+            'v_fighter': 150}
+
+
+def callback_payload(values, session_id, changed, plotted):
+    return {
+        'output': ('..trajectory-plot.figure...trajectory-plot.style...solver-status.children'
+                   '...plotted-scenario.data..'),
+        'outputs': [{'id': 'trajectory-plot', 'property': 'figure'},
+                    {'id': 'trajectory-plot', 'property': 'style'},
+                    {'id': 'solver-status', 'property': 'children'},
+                    {'id': 'plotted-scenario', 'property': 'data'}],
+        'inputs': [{'id': name, 'property': 'value', 'value': values[name]}
+                   for name, *_ in SLIDERS],
+        'state': [{'id': 'session-id', 'property': 'data', 'value': session_id},
+                  {'id': 'plotted-scenario', 'property': 'data',
+                   'value': [plotted[name] for name, *_ in SLIDERS]}],
+        'changedPropIds': [changed + '.value'],
+    }
+
+
+def post(url, payload, timeout):
+    """Send one callback request; returns (status, seconds)."""
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def run_session(url, steps, burst, think, seed, timeout, results, lock):
+    rng = random.Random(seed)
+    session_id = uuid.UUID(int=rng.getrandbits(128)).hex
+    values = dict(DEFAULTS)
+    with concurrent.futures.ThreadPoolExecutor(burst) as requests:
+        for _ in range(steps):
+            # One drag: consecutive values of one slider, sent back to back
+            name, lo, hi, step = rng.choice(SLIDERS)
+            direction = rng.choice((-1, 1))
+            # The figure shows the end of the previous drag
+            plotted = dict(values)
+            futures = []
+            for _ in range(burst):
+                values[name] = min(hi, max(lo, values[name] + direction * step))
+                futures.append(requests.submit(
+                    post, url, callback_payload(values, session_id, name, plotted), timeout))
+                time.sleep(0.01)
+            outcome = [f.result() for f in futures]
+            with lock:
+                results.extend(outcome)
+            time.sleep(rng.uniform(0, 2 * think))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--steps', type=int, default=20, help='slider drags per session')
+    parser.add_argument('--burst', type=int, default=3, help='requests per drag')
+    parser.add_argument('--think', type=float, default=0.5,
+                        help='mean pause between drags, in seconds')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/') + '/_dash-update-component'
+    results = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(args.sessions) as sessions:
+        for future in [sessions.submit(run_session, url, args.steps, args.burst, args.think,
+                                       args.seed + i, args.timeout, results, lock)
+                       for i in range(args.sessions)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    status = np.array([s for s, _ in results])
+    latency = np.array([t for _, t in results]) * 1e3
+    answered = latency[status == 200]
+    print(f'{len(results)} requests from {args.sessions} sessions in {elapsed:.1f} s '
+          f'({len(results) / elapsed:.0f} req/s)')
+    print(f'answered {answered.size}, superseded {np.count_nonzero(status == 204)}, '
+          f'failed {np.count_nonzero((status != 200) & (status != 204))}')
+    if answered.size:
+        p50, p95, p99 = np.percentile(answered, [50, 95, 99])
+        print(f'latency p50 {p50:.0f} ms  p95 {p95:.0f} ms  p99 {p99:.0f} ms  '
+              f'max {answered.max():.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
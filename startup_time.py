@@ -0,0 +1,179 @@
+"""Cold-start measurements for the dashboards and the game.
+
+For each target this reports
+
+* the import-time breakdown from ``python -X importtime``: total time and
+  the slowest top-level imports, plus whether scipy, plotly, dash or
+  streamlit were loaded at all;
+* time to first response: for the Dash app, from process start until
+  ``/_dash-layout`` (which renders the default plot) answers; for Streamlit,
+  until its health endpoint answers; for the game, the wall time of
+  ``python game.py --test`` on the dummy video driver.
+
+Every measurement runs in a fresh interpreter, so nothing is cached between
+them (the OS file cache aside).
+
+    python startup_time.py
+    python startup_time.py --repeat 5 --out startup.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Packages whose presence after import is worth calling out
+HEAVY = ('scipy', 'plotly', 'dash', 'streamlit', 'pygame')
+
+IMPORT_TARGETS = {
+    'dash app': 'bomber_aim_5',
+    'streamlit app': 'streamlit_app',
+    'game': 'game',
+    'aiming core': 'aiming.figure',
+}
+
+
+def _env():
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [HERE, env.get('PYTHONPATH')]))
+    return env
+
+
+def import_breakdown(module, top=8):
+    """Import ``module`` in a fresh interpreter under ``-X importtime``."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=HERE, env=_env(), capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1]}
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indented name>"
+        head, cumulative_us, name = line.split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(head.split(':')[1]), int(cumulative_us)))
+
+    # Entries are printed after their children: the target's direct imports
+    # are the depth-1 rows between the previous top-level entry and it
+    end = max(i for i, r in enumerate(rows) if r[0] == 0 and r[1] == module)
+    begin = max([i for i, r in enumerate(rows[:end]) if r[0] == 0], default=-1) + 1
+    children = sorted((r for r in rows[begin:end] if r[0] == 1), key=lambda r: -r[3])
+    loaded = {name.split('.')[0] for _, name, _, _ in rows}
+    return {
+        'wall_s': wall,
+        'import_s': rows[end][3] / 1e6,
+        'slowest': [(name, cumulative / 1e6) for _, name, _, cumulative in children[:top]],
+        'loaded': [name for name in HEAVY if name in loaded],
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, proc, timeout):
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            return None
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+                return time.perf_counter()
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.02)
+    return None
+
+
+def first_response(command, url_path, port, timeout=60.0):
+    """Seconds from starting ``command`` until ``url_path`` answers."""
+    env = _env()
+    env['PORT'] = str(port)
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=HERE, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        answered = _wait_for(f'http://127.0.0.1:{port}{url_path}', proc, timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return None if answered is None else answered - start
+
+
+def dash_first_response():
+    return first_response([sys.executable, 'bomber_aim_5.py'], '/_dash-layout', _free_port())
+
+
+def streamlit_first_response():
+    if importlib.util.find_spec('streamlit') is None:
+        return None
+    port = _free_port()
+    return first_response([sys.executable, '-m', 'streamlit', 'run', 'streamlit_app.py',
+                           '--server.headless', 'true', '--server.port', str(port)],
+                          '/_stcore/health', port)
+
+
+def game_test_run():
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, 'game.py', '--test'], cwd=HERE, env=_env(),
+                          capture_output=True)
+    return time.perf_counter() - start if proc.returncode == 0 else None
+
+
+def _best(fn, repeat):
+    times = [t for t in (fn() for _ in range(repeat)) if t is not None]
+    return min(times) if times else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per measurement; the fastest is reported')
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list')
+    parser.add_argument('--out', default=None, help='also write the results as JSON')
+    args = parser.parse_args()
+
+    report = {'python': sys.version.split()[0], 'imports': {}, 'first_response_s': {}}
+    for label, module in IMPORT_TARGETS.items():
+        runs = [import_breakdown(module, args.top) for _ in range(args.repeat)]
+        ok = [r for r in runs if 'error' not in r]
+        if not ok:
+            print(f'{label:14s} import {module}: {runs[0]["error"]}')
+            report['imports'][label] = runs[0]
+            continue
+        best = min(ok, key=lambda r: r['import_s'])
+        report['imports'][label] = best
+        print(f'{label:14s} import {module}: {best["import_s"] * 1e3:7.1f} ms '
+              f'(interpreter {best["wall_s"] * 1e3:.0f} ms), '
+              f'loads {", ".join(best["loaded"]) or "none of " + "/".join(HEAVY)}')
+        for name, seconds in best['slowest']:
+            print(f'{"":16s}{seconds * 1e3:7.1f} ms  {name}')
+
+    for label, fn in (('dash app', dash_first_response),
+                      ('streamlit app', streamlit_first_response),
+                      ('game --test', game_test_run)):
+        seconds = _best(fn, args.repeat)
+        report['first_response_s'][label] = seconds
+        shown = 'unavailable' if seconds is None else f'{seconds * 1e3:7.0f} ms'
+        print(f'first response, {label:14s} {shown}')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
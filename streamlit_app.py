@@ -1,41 +1,50 @@
 import streamlit as st
-import numpy as np
-from scipy.optimize import fsolve
-import plotly.graph_objs as go
-from scipy.integrate import solve_ivp
-import scipy.integrate as integrate
-from numpy import interp
-
-def bullet_position_function(t, v0 = 890):
-    ## This differential equation can be solved numerically to obtain the velocity as a function of time
-    # Constants  # initial velocity in m/s
-    m = 0.045  # mass in kg
-    Cd = 0.295  # drag coefficient
-    A = 0.000071  # cross-sectional area in m^2
-    rho = 1.225  # air density in kg/m^3
-
-    # Differential equation for velocity reduction
-    def velocity_reduction(t, v):
-        return - (0.5 * rho * v**2 * Cd * A) / m
-
-    # Time span (0 to 10 seconds)
-    t_span = (0, t)
-    # Initial condition
-    v_init = [v0]
-
-    # Solving the differential equation
-    sol = solve_ivp(velocity_reduction, t_span, v_init, t_eval=np.linspace(0, t, 500))
-
-    def bullet_velocity_function(t):
-        # global t_span, sol
-        # if t_span is None or sol is None:
-        #     raise ValueError("Solution values have not been computed yet.")    
-        # Create an interpolation function using the solution values
-        # Evaluate the interpolation function at the given time t
-        return interp(t, np.linspace(0, t, 500), sol.y[0])
-
-    result, error = integrate.quad(bullet_velocity_function, 0, t)
-    return result
+from aiming.cache import SolutionCache, scenario_key
+from aiming.envelope import iter_envelope
+from aiming.figure import FigureBuilder, plot_scenario
+from aiming.montecarlo import DEFAULT_DISPERSION, HIT_RADIUS, iter_hit_probability
+from aiming.pool import LatestRequestPool
+from aiming.solver import get_solver
+
+@st.cache_resource
+def get_solution_cache():
+    # One cache per server process, shared across reruns and sessions
+    return SolutionCache()
+
+@st.cache_resource
+def get_envelope_cache():
+    # Finest envelope grid per velocity triple; each holds about a MB
+    return SolutionCache(maxsize=32)
+
+@st.cache_resource
+def get_pool():
+    # Worker processes for the hit-probability chunks, shared by all sessions
+    return LatestRequestPool()
+
+@st.cache_resource
+def get_figure_builder():
+    # Static part of every figure; only coordinates, title and ranges change.
+    # plotly is only needed for its theme, so it is imported here
+    import plotly.io as pio
+    return FigureBuilder(layout=dict(
+        template=pio.templates[pio.templates.default].to_plotly_json(),
+        xaxis=dict(title=dict(text='Fighter Frontal Distance (m)'), showgrid=True,
+                   scaleanchor='y'),  # Ensure the x-axis is scaled to the y-axis
+        yaxis=dict(title=dict(text='Fighter Lateral Distance (m)'), showgrid=True),
+        showlegend=True,
+        legend=dict(
+            orientation="h",  # Horizontal orientation
+            x=0,            # Center horizontally
+            y=-0.4,           # Position below the plot area
+            xanchor='left', # Anchor the x
+            yanchor='top',
+            itemwidth=100,  # Adjust the width of legend items to make them narrower
+            tracegroupgap=10  # Add some vertical space between legend groups
+        ),
+        dragmode=False,
+        autosize=True,  # Automatically adjust the plot size
+        height=600
+    ), aim_line_scale=2 * 10)  # Extend the aiming line for better visualization
 
 # Streamlit app
 def main():
@@ -52,124 +61,74 @@ def main():
         v_bomber = st.slider("Bomber Velocity (m/s)", min_value=50, max_value=300, step=10, value=100)
         v_fighter = st.slider("Fighter Velocity (m/s)", min_value=50, max_value=500, step=10, value=150)
 
-    # Function to calculate the aiming angle and plot the trajectories
-    def calculate_trajectory(v_bullet, v_bomber, v_fighter, d, initial_fighter_y):
-        # Define the equations to solve for the time t and angle phi
-        def equations(vars):
-            t, phi = vars
-            v0_bullet_x = v_bomber + v_bullet * np.cos(phi)
-            v0_bullet_y = v_bullet * np.sin(phi)
-            v0_bullet_norm = (v0_bullet_x**2 + v0_bullet_y**2)**0.5
-            bullet_postion_norm = bullet_position_function(t, v0_bullet_norm)
-            x_bullet = bullet_postion_norm * v0_bullet_x / v0_bullet_norm
-            y_bullet = bullet_postion_norm * v0_bullet_y / v0_bullet_norm
-            x_fighter = d
-            y_fighter = initial_fighter_y - v_fighter * t
-            return [x_bullet - x_fighter, y_bullet - y_fighter]
-
-        # Initial guess for t and phi
-        initial_guess = [1.0, np.arctan(initial_fighter_y / d)]
-
-        # Solve the equations
-        solution = fsolve(equations, initial_guess)
-        t_solution, phi_solution = solution
-
-        # Convert the angle to degrees
-        theta_degrees = np.degrees(phi_solution)
-
-        # Generate time points for plotting the bullet trajectory
-        # t_total = np.linspace(0, t_solution, 100)
-        # x_bullet_trajectory = v_bomber * t_total + v_bullet * np.cos(phi_solution) * t_total
-        # y_bullet_trajectory = v_bullet * np.sin(phi_solution) * t_total
-
-        # Calculate the aiming direction line based on phi_solution
-        aiming_line_length = d * 2  # Extend the aiming line for better visualization
-        aiming_line_x = [0, aiming_line_length * np.cos(phi_solution) * 10]
-        aiming_line_y = [0, aiming_line_length * np.sin(phi_solution) * 10]
-
-        return t_solution, phi_solution, theta_degrees, aiming_line_x, aiming_line_y
-
-    # Get the plot data and aiming angle
-    t_solution, phi_solution, theta_degrees, aiming_line_x, aiming_line_y = calculate_trajectory(
-        v_bullet, v_bomber, v_fighter, d, initial_fighter_y
-    )
-
-    # Plotting data
-    bomber_path = go.Scatter(x=[0, v_bomber * t_solution], y=[0, 0],
-                             mode='lines', name='Bomber Path', line=dict(color='blue', width=3))
-    fighter_path = go.Scatter(x=[d, d], y=[initial_fighter_y, initial_fighter_y - v_fighter * t_solution], mode='lines', name='Fighter Path', line=dict(color='green', width=3))
-
-    bullet_trajectory = go.Scatter(
-        x=[0, d], y=[0, initial_fighter_y - v_fighter * t_solution], mode='lines', name='Bullet Trajectory', line=dict(color='red')
-    )
-
-    aiming_direction = go.Scatter(
-        x=aiming_line_x, y=aiming_line_y, mode='lines', name='Aiming Direction',
-        line=dict(dash='dot', color='orange')
-    )
-
-    # Points for initial and impact positions
-    # Unicode airplane symbols
-    airplane_symbols = ['✈️', '🛩️', '🛫', '🛬', '✈️']
-
-    initial_bomber_point = go.Scatter(
-        x=[0], y=[0],
-        mode='markers+text', name='✈️ Initial Bomber Position',
-        text='✈️', textfont=dict(size=20), textposition='middle center',
-        marker=dict(color='blue', size=10, symbol='circle')
-    )
-
-    impact_bomber_point = go.Scatter(
-        x=[v_bomber * t_solution], y=[0],
-        mode='markers', name='Impact Bomber Position',
-        marker=dict(color='blue', size=10, symbol='x')
-    )
-
-    initial_fighter_point = go.Scatter(
-        x=[d], y=[initial_fighter_y],
-        mode='markers+text', name='🛩️ Initial Fighter Position',
-        text='🛩️', textfont=dict(size=20), textposition='middle center',
-        marker=dict(color='green', size=10, symbol='square')
-    )
-
-    impact_fighter_y = initial_fighter_y - v_fighter * t_solution
-    impact_fighter_point = go.Scatter(
-        x=[d], y=[impact_fighter_y],
-        mode='markers', name='Impact Fighter Position',
-        marker=dict(color='green', size=10, symbol='x')
-    )
-
-    # Create the plot layout with larger plot area
-    layout = go.Layout(
-        title=f'Aiming Angle: {theta_degrees:.2f} degrees',
-        xaxis=dict(title='Fighter Frontal Distance (m)', showgrid=True, range=[-10, d * 1.1],
-                   scaleanchor='y'),  # Ensure the x-axis is scaled to the y-axis),
-        yaxis=dict(title='Fighter Lateral Distance (m)', showgrid=True, range=[min(impact_fighter_y* 1.2, -100), initial_fighter_y * 1.2]),
-        showlegend=True,
-        legend=dict(
-            orientation="h",  # Horizontal orientation
-            x=0,            # Center horizontally
-            y=-0.4,           # Position below the plot area
-            xanchor='left', # Anchor the x
-            yanchor='top',
-            itemwidth=100,  # Adjust the width of legend items to make them narrower
-            tracegroupgap=10  # Add some vertical space between legend groups
-        ),
-        dragmode=False,
-        autosize=True,  # Automatically adjust the plot size
-        width=None,  # Set the width to None to make it responsive
-        height=600
-    )
-
-    # Create the figure
-    figure = go.Figure(data=[bomber_path, fighter_path, bullet_trajectory, aiming_direction,
-                        initial_bomber_point, impact_bomber_point,
-                        initial_fighter_point, impact_fighter_point])
+    view = st.radio("View", ["Scenario", "Engagement envelope"], horizontal=True)
+    if view == "Engagement envelope":
+        show_envelope(d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+        return
 
-    figure.update_layout(layout)
+    # Serve repeated slider positions from the cache instead of re-solving;
+    # new ones are warm-started from this session's previous scenario
+    solution_cache = get_solution_cache()
+    scenario = (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+    key = scenario_key(*scenario)
+    entry = solution_cache.get_or_compute(
+        key, lambda: build_plot(*scenario, previous=st.session_state.get('previous')))
+    st.session_state['previous'] = (scenario, entry['solution'])
 
     # Display the plot using Streamlit
-    st.plotly_chart(figure, use_container_width=True)
+    st.plotly_chart(entry['figure'], use_container_width=True)
+    if entry['solution'].converged:
+        st.caption(entry['solution'].status)
+    else:
+        st.warning(entry['solution'].status)
+    stats = solution_cache.stats()
+    st.caption(f"Solution cache: {stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries")
+
+    with st.expander("Hit Probability"):
+        st.write(f"Muzzle velocity spread {DEFAULT_DISPERSION.muzzle_velocity:g} m/s, "
+                 f"angular dispersion {DEFAULT_DISPERSION.angle * 1e3:g} mrad, fighter speed "
+                 f"uncertainty {DEFAULT_DISPERSION.fighter_speed:g} m/s, hit within {HIT_RADIUS:g} m.")
+        if st.button("Estimate hit probability"):
+            show_hit_probability(d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+
+def show_hit_probability(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
+    # Update a progress bar after every chunk of shots until the estimate converges
+    scenario = (d, initial_fighter_y, v_bullet, v_bomber, v_fighter)
+    aim = get_solver().solve(*scenario)
+    if not aim.converged:
+        st.warning(aim.status)
+        return
+    pool = get_pool()
+    bar = st.progress(0.0)
+    text = st.empty()
+    for estimate in iter_hit_probability(*scenario, submit=pool.submit,
+                                         parallel=max(pool.workers, 1), aim=aim):
+        bar.progress(estimate.progress())
+        text.write(f"Hit probability {estimate.p:.1%} (95% confidence {estimate.low:.1%} to "
+                   f"{estimate.high:.1%}) from {estimate.samples:,} shots")
+
+def show_envelope(d, initial_fighter_y, v_bullet, v_bomber, v_fighter):
+    # Draw each level of the envelope as soon as it is solved, coarse first
+    builder = get_figure_builder()
+    envelope_cache = get_envelope_cache()
+    key = scenario_key(0, 0, v_bullet, v_bomber, v_fighter)
+    chart = st.empty()
+    envelope = envelope_cache.get(key)
+    if envelope is None:
+        for envelope in iter_envelope(v_bullet, v_bomber, v_fighter):
+            chart.plotly_chart(builder.build_envelope(envelope, d, initial_fighter_y),
+                               use_container_width=True)
+        envelope_cache.put(key, envelope)
+    else:
+        chart.plotly_chart(builder.build_envelope(envelope, d, initial_fighter_y),
+                           use_container_width=True)
+    st.caption("Aim angle over every fighter position for the current velocities; "
+               "white lines are times of flight in seconds")
+
+def build_plot(d, initial_fighter_y, v_bullet, v_bomber, v_fighter, previous=None):
+    # Solve the scenario and fill in the figure template
+    return plot_scenario(get_figure_builder(), d, initial_fighter_y, v_bullet, v_bomber, v_fighter,
+                         previous=previous)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
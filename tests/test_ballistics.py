@@ -0,0 +1,48 @@
+"""Regression tests of the closed-form ballistics against the numerical path."""
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from aiming.ballistics import (K_DRAG, bullet_position, bullet_position_numerical,
+                               bullet_velocity, time_to_range)
+
+TIMES = [0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0]
+SPEEDS = [500.0, 700.0, 890.0, 1100.0]
+
+RTOL = 1e-8
+
+
+@pytest.mark.parametrize('v0', SPEEDS)
+@pytest.mark.parametrize('t', TIMES)
+def test_position_matches_numerical(t, v0):
+    assert bullet_position(t, v0) == pytest.approx(bullet_position_numerical(t, v0), rel=RTOL)
+
+
+@pytest.mark.parametrize('v0', SPEEDS)
+def test_velocity_matches_numerical(v0):
+    sol = solve_ivp(lambda t, v: -K_DRAG * v**2, (0, TIMES[-1]), [v0], t_eval=TIMES,
+                    rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(bullet_velocity(np.array(TIMES), v0), sol.y[0], rtol=RTOL)
+
+
+@pytest.mark.parametrize('v0', SPEEDS)
+@pytest.mark.parametrize('t', TIMES)
+def test_time_to_range_round_trip(t, v0):
+    x = bullet_position_numerical(t, v0)
+    assert time_to_range(x, v0) == pytest.approx(t, rel=RTOL)
+    assert time_to_range(bullet_position(t, v0), v0) == pytest.approx(t, rel=1e-12)
+
+
+def test_broadcasting():
+    t = np.array(TIMES)[:, None]
+    v0 = np.array(SPEEDS)[None, :]
+    x = bullet_position(t, v0)
+    v = bullet_velocity(t, v0)
+    assert x.shape == v.shape == (len(TIMES), len(SPEEDS))
+    for i, ti in enumerate(TIMES):
+        for j, vj in enumerate(SPEEDS):
+            assert x[i, j] == bullet_position(ti, vj)
+            assert v[i, j] == bullet_velocity(ti, vj)
+    np.testing.assert_allclose(time_to_range(x, v0), np.broadcast_to(t, x.shape), rtol=1e-12)
+    # Scalars stay scalars
+    assert np.ndim(bullet_position(1.0, 890.0)) == 0
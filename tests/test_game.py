@@ -0,0 +1,137 @@
+"""Headless game checks that do not need a window."""
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import game  # noqa: E402
+from engine import collision  # noqa: E402
+from engine.inputs import ScriptedInput, TrackingInput  # noqa: E402
+
+
+@pytest.mark.parametrize('turrets', [0, 5])
+def test_checksum_matches_across_entity_storages(turrets):
+    digests = []
+    for use_arrays in (False, True):
+        g = game.Game(headless=True, use_arrays=use_arrays, seed=7,
+                      input_source=TrackingInput(), turrets=turrets)
+        for _ in range(500):
+            g.step(1.0 / 60)
+        digests.append(g.checksum())
+    assert digests[0] == digests[1]
+
+
+def entity_positions(g):
+    """Fighter ``(id, x, y)`` rows and live bullet ``(x, y)`` rows, sorted."""
+    ids, ex, ey, _ = g.enemy_state()
+    if g.use_arrays:
+        live = g.bullets.active[:g.bullets.n]
+        bx, by = g.bullets.x[:g.bullets.n][live], g.bullets.y[:g.bullets.n][live]
+    else:
+        bx = [b.x for b in g.bullets if b.active]
+        by = [b.y for b in g.bullets if b.active]
+    enemies = np.column_stack([np.asarray(a, dtype=float) for a in (ids, ex, ey)])
+    bullets = np.column_stack([np.asarray(a, dtype=float) for a in (bx, by)])
+    return (enemies[np.lexsort(enemies.T[::-1])].reshape(-1, 3),
+            bullets[np.lexsort(bullets.T[::-1])].reshape(-1, 2))
+
+
+@pytest.mark.parametrize('turrets', [0, 5])
+def test_entity_positions_match_across_entity_storages(turrets):
+    games = [game.Game(headless=True, use_arrays=use_arrays, seed=11,
+                       input_source=TrackingInput(), turrets=turrets)
+             for use_arrays in (False, True)]
+    for frame in range(300):
+        for g in games:
+            g.step(1.0 / 60)
+        (objects_enemies, objects_bullets), (arrays_enemies, arrays_bullets) = (
+            entity_positions(g) for g in games)
+        np.testing.assert_array_equal(objects_enemies, arrays_enemies, err_msg=f'frame {frame}')
+        np.testing.assert_array_equal(objects_bullets, arrays_bullets, err_msg=f'frame {frame}')
+
+
+def overlapping_pairs(a_bounds, b_bounds):
+    """Every ``(a, b)`` index pair of overlapping inclusive boxes, by brute force."""
+    ax0, ay0, ax1, ay1 = (np.asarray(v)[:, None] for v in a_bounds)
+    bx0, by0, bx1, by1 = (np.asarray(v)[None, :] for v in b_bounds)
+    a, b = np.nonzero((ax0 <= bx1) & (bx0 <= ax1) & (ay0 <= by1) & (by0 <= ay1))
+    return sorted(zip(a.tolist(), b.tolist()))
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('points', [False, True])
+def test_grid_candidate_pairs_match_brute_force(seed, points):
+    rng = np.random.default_rng(seed)
+    ax0 = rng.integers(-200, 800, 150).astype(float)
+    ay0 = rng.integers(-200, 600, 150).astype(float)
+    a_bounds = (ax0, ay0, ax0 + rng.integers(0, 60, 150), ay0 + rng.integers(0, 60, 150))
+    bx0 = rng.uniform(-200, 800, 400)
+    by0 = rng.uniform(-200, 600, 400)
+    if points:
+        b_bounds = (bx0, by0, bx0, by0)
+    else:
+        b_bounds = (bx0, by0, bx0 + rng.uniform(0, 40, 400), by0 + rng.uniform(0, 40, 400))
+    a, b = collision.candidate_pairs(a_bounds, b_bounds, collision.BOX_WIDTH)
+    candidates = list(zip(a.tolist(), b.tolist()))
+    assert len(set(candidates)) == len(candidates)
+    # The broad phase may add pairs that only share a cell, never drop one
+    overlap = ((a_bounds[0][a] <= b_bounds[2][b]) & (b_bounds[0][b] <= a_bounds[2][a]) &
+               (a_bounds[1][a] <= b_bounds[3][b]) & (b_bounds[1][b] <= a_bounds[3][a]))
+    assert sorted(zip(a[overlap].tolist(), b[overlap].tolist())) == overlapping_pairs(
+        a_bounds, b_bounds)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_grid_hits_match_brute_force_hits(seed, monkeypatch):
+    rng = np.random.default_rng(seed)
+    enemies = (rng.uniform(0, 780, 100), rng.uniform(0, 600, 100), rng.permutation(100))
+    x0, y0 = rng.uniform(0, 800, 500), rng.uniform(0, 600, 500)
+    x1, y1 = x0 + rng.uniform(-30, 30, 500), y0 + rng.uniform(-30, 30, 500)
+    order = rng.permutation(500)
+    shift = rng.uniform(-5, 5, 100)
+    results = []
+    for limit in (0, 10 ** 9):
+        monkeypatch.setattr(collision, 'BRUTE_FORCE_PAIRS', limit)
+        results.append(collision.resolve_hits(*enemies, x1, y1, order))
+        results.append(collision.resolve_swept_hits(
+            enemies[0] - shift, enemies[0], enemies[1], enemies[2], x0, y0, x1, y1, order))
+    grid_point, grid_swept, brute_point, brute_swept = results
+    assert grid_point[0].size and grid_swept[0].size
+    for grid, brute in ((grid_point, brute_point), (grid_swept, brute_swept)):
+        np.testing.assert_array_equal(grid[0], brute[0])
+        np.testing.assert_array_equal(grid[1], brute[1])
+
+
+def test_swept_collision_catches_bullet_tunnelling_through_fighter():
+    # A fighter box spans x 100..120 and y 90..110; in one frame the bullet
+    # jumps from well above it to well below it
+    fighter = (np.array([100.0]), np.array([100.0]), np.array([0]))
+    bullet_start = (np.array([110.0]), np.array([40.0]))
+    bullet_end = (np.array([110.0]), np.array([160.0]))
+    e, b = collision.resolve_hits(*fighter, *bullet_end, np.array([0]))
+    assert e.size == 0
+    e, b = collision.resolve_swept_hits(fighter[0], *fighter, *bullet_start, *bullet_end,
+                                        np.array([0]))
+    assert e.tolist() == [0] and b.tolist() == [0]
+
+
+@pytest.mark.parametrize('use_arrays', [False, True])
+def test_swept_game_hits_fighter_a_fast_bullet_would_skip(use_arrays):
+    dt = 0.1
+    scores = []
+    for swept in (False, True):
+        g = game.Game(headless=True, use_arrays=use_arrays, swept=swept, seed=3,
+                      input_source=ScriptedInput([]))
+        while not len(g.enemy_state()[0]):
+            g.step(1.0 / 60)
+        score = g.score
+        # Fire straight up from 40 px below where the fighter ends the step;
+        # the bullet flies about 85 px in it, clean past the 20 px box
+        _, x, y, vx = g.enemy_state()
+        g.shoot_from(float(x[0] + vx[0] * dt) + 10, float(y[0]) + 40, -np.pi / 2)
+        g.step(dt)
+        scores.append(g.score - score)
+    assert scores == [0, 1]
@@ -0,0 +1,94 @@
+"""Precomputed aim table against the live Newton solver."""
+import numpy as np
+import pytest
+
+from aiming.ballistics import K_DRAG
+from aiming.batch import solve_batch
+from aiming.solver import AimSolver
+from aiming.table import PARAMS, TABLE_VERSION, AimTable, build_table
+
+SMALL_AXES = {
+    'd': np.arange(100, 1101, 250, dtype=float),
+    'initial_fighter_y': np.arange(100, 1101, 250, dtype=float),
+    'v_bullet': np.arange(500, 1001, 250, dtype=float),
+    'v_bomber': np.arange(50, 301, 125, dtype=float),
+    'v_fighter': np.arange(50, 501, 150, dtype=float),
+}
+
+
+@pytest.fixture(scope='module')
+def table_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('table') / 'aim_table')
+    build_table(path, SMALL_AXES)
+    return path
+
+
+def scenarios(n, seed=0):
+    """``n`` random scenarios inside the small table, a few on its nodes."""
+    rng = np.random.default_rng(seed)
+    q = [rng.uniform(a[0], a[-1], n) for a in SMALL_AXES.values()]
+    for a, column in zip(SMALL_AXES.values(), q):
+        column[:n // 4] = rng.choice(a, n // 4)
+    return q
+
+
+def assert_matches_live(result, q, tol=1e-6):
+    t, phi, converged = solve_batch(*q, tol=tol)
+    np.testing.assert_array_equal(result[2], converged)
+    np.testing.assert_allclose(result[0][converged], t[converged], rtol=1e-6)
+    np.testing.assert_allclose(result[1][converged], phi[converged], atol=1e-6)
+
+
+def test_scalar_lookup_matches_live_solver(table_path):
+    table = AimTable(table_path)
+    assert table.fresh
+    q = scenarios(200)
+    result = np.array([[float(v) for v in table.lookup(*scenario)] for scenario in zip(*q)]).T
+    assert_matches_live((result[0], result[1], result[2].astype(bool)), q)
+
+
+def test_array_lookup_matches_live_solver(table_path):
+    table = AimTable(table_path)
+    q = scenarios(200, seed=1)
+    assert_matches_live(table.lookup(*q), q)
+
+
+def test_lookup_outside_table_matches_live_solver(table_path):
+    table = AimTable(table_path)
+    q = [np.array([1500.0, 90.0]), np.array([500.0, 500.0]), np.array([890.0, 890.0]),
+         np.array([100.0, 100.0]), np.array([150.0, 150.0])]
+    assert_matches_live(table.lookup(*q), q)
+
+
+def write_meta(path, **changes):
+    meta = dict(np.load(path + '.meta.npz'))
+    meta.update(changes)
+    np.savez(path + '.meta.npz', **meta)
+
+
+@pytest.mark.parametrize('changes, reason', [
+    ({'version': TABLE_VERSION + 1}, 'table format version changed'),
+    ({'k': 2 * K_DRAG}, 'drag constants changed'),
+    ({PARAMS[0]: SMALL_AXES['d'][:-1]}, 'table shape does not match its axes'),
+])
+def test_mismatched_table_falls_back_to_live_solver(tmp_path, changes, reason):
+    path = str(tmp_path / 'aim_table')
+    build_table(path, SMALL_AXES)
+    write_meta(path, **changes)
+    table = AimTable(path)
+    assert not table.fresh
+    assert table.stale_reason == reason
+    assert AimSolver(table=path).table is None
+    q = scenarios(20)
+    expected = solve_batch(*q)
+    for got, want in zip(table.lookup(*q), expected):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_missing_table_falls_back_to_live_solver(tmp_path):
+    table = AimTable(str(tmp_path / 'missing'))
+    assert not table.fresh
+    assert table.stale_reason.startswith('table not readable')
+    for got, want in zip(table.lookup(500, 500, 890, 100, 150),
+                         solve_batch(500, 500, 890, 100, 150)):
+        np.testing.assert_array_equal(got, want)